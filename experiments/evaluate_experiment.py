@@ -4,16 +4,10 @@ CLI tool for evaluating experiment results against ground truth.
 This script relies on code that is not implemented yet, so it's just a placeholder for now.
 """
 
-import sys
 import argparse
 import json
-from pathlib import Path
-
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from evaluation.metrics import evaluate_experiment
-from evaluation.compare import compare_experiments, summarize_comparison
 
 
 def main():
@@ -31,7 +25,7 @@ def main():
     compare_parser = subparsers.add_parser("compare", help="Compare multiple experiments")
     compare_parser.add_argument("--experiments", nargs="+", required=True, help="Experiment result files")
     compare_parser.add_argument("--ground-truth", help="Ground truth annotation")
-    compare_parser.add_argument("--output", help="Output CSV file")
+    compare_parser.add_argument("--output", help="Output CSV (or .parquet) file")
 
     args = parser.parse_args()
 
@@ -62,6 +56,9 @@ def main():
             print(f"\n✓ Results saved to: {args.output}")
 
     elif args.command == "compare":
+        # Imported here: pandas is slow to import and only needed for comparisons
+        from evaluation.compare import compare_experiments, summarize_comparison
+
         # Compare multiple experiments
         print(f"Comparing {len(args.experiments)} experiments...")
 
@@ -3,26 +3,233 @@ Main experiment runner script.
 Loads configuration, initializes system, executes workflow, saves results.
 """
 
+import asyncio
 import logging
 import sys
 import os
 import json
 import argparse
-from pathlib import Path
+import threading
+from concurrent.futures import Future
+from typing import Optional
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
-from core.config_loader import load_config, validate_data_sources
-from core.llm_client import LLMClient
+from core.config_loader import load_config, validate_data_sources, sanitize_config
+from core.llm_client import LLMClient, RateLimiter, create_http_clients
 from core.agent import Agent, AgentConfig
-from core.orchestrator import SingleAgentWorkflow, SequentialWorkflow, HierarchicalWorkflow
+from core.orchestrator import SingleAgentWorkflow, SequentialWorkflow
 from data.log_search import initialize_search, get_search_stats
 from tools.tool_registry import get_tools_for_agent
 from tools import search_tools
 
+try:
+    import orjson
+except ImportError:  # Optional dependency, fall back to the stdlib encoder
+    orjson = None
+
+# Characters in ISO timestamps that are awkward in filenames
+_TIMESTAMP_TRANS = str.maketrans(":.", "--")
+
+
+def dump_json(obj) -> bytes:
+    """Serialize obj as indented JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, indent=2).encode("utf-8")
+
+
+def with_semantic_cache(client: LLMClient, settings: dict):
+    """Wrap a client in a SemanticCache when llm.semantic_cache is configured."""
+    if not settings:
+        return client
+
+    from core.semantic_cache import SemanticCache
+    return SemanticCache(
+        client,
+        embedding_model=settings["embedding_model"],
+        threshold=settings.get("threshold", 0.90),
+        db_path=settings.get("path"),
+        question_marker=settings.get("question_marker")
+    )
+
+
+def start_search(log_sources: list, **kwargs) -> Future:
+    """
+    Run initialize_search() in a daemon thread and return a future for its result.
+
+    Being a daemon, the indexing thread does not keep a failed run from exiting.
+    """
+    future = Future()
+
+    def index():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(initialize_search(log_sources, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=index, name="log-indexer", daemon=True).start()
+    return future
+
+
+async def build_agent(
+    agent_name: str,
+    agent_cfg_dict: dict,
+    llm_client: LLMClient,
+    llm_defaults: dict,
+    client_options: dict
+):
+    """Create one agent, preparing its LLM client without blocking other agents."""
+    try:
+        # Get tools for this agent
+        tool_registry = get_tools_for_agent(agent_cfg_dict["tools"])
+
+        # Create agent config
+        agent_cfg = AgentConfig(
+            name=agent_name,
+            system_prompt=agent_cfg_dict["system_prompt"],
+            tools=agent_cfg_dict["tools"],
+            # Optional overrides
+            model=agent_cfg_dict.get("model"),
+            provider=agent_cfg_dict.get("provider"),
+            base_url=agent_cfg_dict.get("base_url"),
+            api_key=agent_cfg_dict.get("api_key"),
+            max_iterations=agent_cfg_dict.get("max_iterations", 5),
+            max_tokens=agent_cfg_dict.get("max_tokens", 4096),
+            temperature=agent_cfg_dict.get("temperature"),
+            tool_concurrency_limit=agent_cfg_dict.get("tool_concurrency_limit"),
+            speculative=agent_cfg_dict.get("speculative", False),
+            tool_call_log_path=agent_cfg_dict.get("tool_call_log_path"),
+            tool_call_log_tail=agent_cfg_dict.get("tool_call_log_tail", 100),
+            structured_output=agent_cfg_dict.get("structured_output"),
+        )
+
+        # If agent specifies different provider, create dedicated client
+        if (agent_cfg.provider and agent_cfg.provider != llm_defaults["provider"]) or \
+           (agent_cfg.model and agent_cfg.model != llm_defaults["model"]):
+            agent_llm_client = LLMClient(
+                provider=agent_cfg.provider or llm_defaults["provider"],
+                api_key=llm_defaults.get("api_key"),  # Could also support per-agent keys
+                base_url=agent_cfg.base_url or llm_defaults.get("base_url"),
+                **client_options
+            )
+            agent_llm_client = with_semantic_cache(agent_llm_client, llm_defaults.get("semantic_cache"))
+            print(f"✓ Agent '{agent_name}' using dedicated {agent_llm_client.provider} client with model {agent_cfg.model}")
+        else:
+            agent_llm_client = llm_client  # Use shared client
+
+        # Use agent's model or fallback to global
+        agent_model = agent_cfg.model or llm_defaults["model"]
+
+        # Update config with resolved model (so Agent.run() uses correct model)
+        agent_cfg.model = agent_model
+
+        # Probe the provider concurrently with the other agents
+        await agent_llm_client.aconnect(agent_model, prewarm=llm_defaults.get("prewarm", False))
+
+        # Create agent
+        agent = Agent(agent_cfg, agent_llm_client, tool_registry)
+        print(f"✓ Agent '{agent_name}' initialized with tools: {agent_cfg_dict['tools']}")
+        return agent_name, agent
+
+    except Exception as e:
+        print(f"✗ Error initializing agent '{agent_name}': {e}")
+        raise
+
+
+async def build_agents(config: dict, llm_client: LLMClient, llm_defaults: dict, client_options: dict) -> dict:
+    """Create all configured agents concurrently."""
+    built = await asyncio.gather(*(
+        build_agent(agent_name, agent_cfg_dict, llm_client, llm_defaults, client_options)
+        for agent_name, agent_cfg_dict in config["agents"].items()
+    ))
+    return dict(built)
+
+
+async def run_workflow(
+    config: dict,
+    task: str,
+    llm_client: LLMClient,
+    llm_defaults: dict,
+    client_options: dict,
+    search_future: Future
+) -> Optional[dict]:
+    """
+    Build the agents, wait for the search index and execute the workflow.
+
+    Returns:
+        Workflow result, or None if a step failed (the error is printed)
+    """
+    try:
+        # Initialize agents
+        print("\nInitializing agents...")
+        try:
+            agents = await build_agents(config, llm_client, llm_defaults, client_options)
+        except Exception:
+            return None
+
+        # Wait for indexing to finish before any agent can search
+        try:
+            num_logs = await asyncio.wrap_future(search_future)
+            print(f"\n✓ Indexed {num_logs:,} log entries")
+
+            stats = get_search_stats()
+            if stats["cached"]:
+                print("✓ Using cached index")
+            print(f"  Sources: {', '.join(stats['sources'])}")
+        except Exception as e:
+            print(f"✗ Error initializing search: {e}")
+            return None
+
+        # Create workflow
+        print("\nCreating workflow...")
+        workflow_type = config["workflow"]["type"]
+        try:
+            if workflow_type == "single_agent":
+                workflow = SingleAgentWorkflow(agents, config["workflow"])
+            elif workflow_type == "sequential":
+                workflow = SequentialWorkflow(agents, config["workflow"])
+            elif workflow_type == "hierarchical":
+                from core.orchestrator import HierarchicalWorkflow
+                workflow = HierarchicalWorkflow(agents, config["workflow"])
+                logging.info("Hierarchical workflow is experimental and may be unstable.")
+            else:
+                raise ValueError(f"Unsupported workflow type: {workflow_type}")
+
+            print(f"✓ {workflow_type} workflow created")
+        except Exception as e:
+            print(f"✗ Error creating workflow: {e}")
+            return None
+
+        # Execute workflow
+        print(f"\nExecuting workflow with task: {task}")
+        print("=" * 80)
+        try:
+            data = {
+                "log_source": config["data"]["log_source"],
+                "intent_source": config["data"].get("intent_source")
+            }
+
+            return await workflow.aexecute(task, data)
+
+        except Exception as e:
+            print(f"\n✗ Error executing workflow: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+    finally:
+        # Pooled connections belong to this event loop, close them before it ends
+        await client_options["async_http_client"].aclose()
+
 
 def main():
+    # Use libuv's event loop for the asyncio.run() call below when available
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     parser = argparse.ArgumentParser(description="Run iExplain experiment")
     parser.add_argument(
         "--config",
@@ -59,31 +266,43 @@ def main():
         print(f"✗ Error validating data sources: {e}")
         sys.exit(1)
 
-    # Initialize log search
+    # Initialize log search in the background while clients and agents are set up
     print("\nInitializing search system...")
     log_sources = [config["data"]["log_source"]]
-    
-    try:
-        num_logs = initialize_search(log_sources, db_path=":memory:")
-        print(f"✓ Indexed {num_logs:,} log entries")
-        
-        stats = get_search_stats()
-        print(f"  Sources: {', '.join(stats['sources'])}")
-    except Exception as e:
-        print(f"✗ Error initializing search: {e}")
-        sys.exit(1)
+    search_future = start_search(
+        log_sources,
+        db_path=":memory:",
+        cache_dir=config["data"].get("index_cache_dir")
+    )
 
     # Initialize LLM client
     print("\nInitializing LLM client...")
     try:
+        # Every LLM client shares one connection pool and one rate limiter,
+        # so the llm limits hold for the experiment as a whole
+        http_client, async_http_client = create_http_clients()
+        client_options = {
+            "http_client": http_client,
+            "async_http_client": async_http_client,
+            "rate_limiter": RateLimiter(
+                max_concurrent=config["llm"].get("max_concurrent"),
+                rpm=config["llm"].get("rpm"),
+                tpm=config["llm"].get("tpm")
+            ),
+            "cache_size": config["llm"].get("cache_size", 0),
+            "cache_path": config["llm"].get("cache_path"),
+        }
         llm_client = LLMClient(
             provider=config["llm"]["provider"],
             api_key=config["llm"].get("api_key"),
-            base_url=config["llm"].get("base_url")
+            base_url=config["llm"].get("base_url"),
+            **client_options
         )
+        llm_client = with_semantic_cache(llm_client, config["llm"].get("semantic_cache"))
         print("✓ LLM client initialized")
     except Exception as e:
         print(f"✗ Error initializing LLM client: {e}")
+        search_future.cancel()
         sys.exit(1)
 
     # Build LLM defaults for agents
@@ -92,119 +311,43 @@ def main():
         "provider": config["llm"]["provider"],
         "api_key": config["llm"].get("api_key"),
         "base_url": config["llm"].get("base_url"),
+        "semantic_cache": config["llm"].get("semantic_cache"),
+        "prewarm": config["llm"].get("prewarm", False),
     }
 
-    # Initialize agents
-    print("\nInitializing agents...")
-    agents = {}
-    for agent_name, agent_cfg_dict in config["agents"].items():
-        try:
-            # Get tools for this agent
-            tool_registry = get_tools_for_agent(agent_cfg_dict["tools"])
-
-            # Create agent config
-            agent_cfg = AgentConfig(
-                name=agent_name,
-                system_prompt=agent_cfg_dict["system_prompt"],
-                tools=agent_cfg_dict["tools"],
-                # Optional overrides
-                model=agent_cfg_dict.get("model"),
-                provider=agent_cfg_dict.get("provider"),
-                base_url=agent_cfg_dict.get("base_url"),
-                api_key=agent_cfg_dict.get("api_key"),
-                max_iterations=agent_cfg_dict.get("max_iterations", 5),
-                max_tokens=agent_cfg_dict.get("max_tokens", 4096),
-                temperature=agent_cfg_dict.get("temperature"),
-                structured_output=agent_cfg_dict.get("structured_output"),
-            )
-
-             # If agent specifies different provider, create dedicated client
-            if (agent_cfg.provider and agent_cfg.provider != llm_defaults["provider"]) or \
-               (agent_cfg.model and agent_cfg.model != llm_defaults["model"]):
-                agent_llm_client = LLMClient(
-                    provider=agent_cfg.provider,
-                    api_key=llm_defaults.get("api_key"),  # Could also support per-agent keys
-                    base_url=agent_cfg.base_url or llm_defaults.get("base_url")
-                )
-                print(f"✓ Agent '{agent_name}' using dedicated {agent_cfg.provider} client with model {agent_cfg.model}")
-            else:
-                agent_llm_client = llm_client  # Use shared client
-        
-            # Use agent's model or fallback to global
-            agent_model = agent_cfg.model or llm_defaults["model"]
-            
-            # Update config with resolved model (so Agent.run() uses correct model)
-            agent_cfg.model = agent_model
-
-            # Create agent
-            agent = Agent(agent_cfg, agent_llm_client, tool_registry)
-            agents[agent_name] = agent
-            print(f"✓ Agent '{agent_name}' initialized with tools: {agent_cfg_dict['tools']}")
-
-        except Exception as e:
-            print(f"✗ Error initializing agent '{agent_name}': {e}")
-            sys.exit(1)
-
-    # Create workflow
-    print("\nCreating workflow...")
-    workflow_type = config["workflow"]["type"]
+    # Build agents and run the workflow on one event loop, which the pooled
+    # async HTTP client is bound to
     try:
-        if workflow_type == "single_agent":
-            workflow = SingleAgentWorkflow(agents, config["workflow"])
-        elif workflow_type == "sequential":
-            workflow = SequentialWorkflow(agents, config["workflow"])
-        elif workflow_type == "hierarchical":
-            workflow = HierarchicalWorkflow(agents, config["workflow"])
-            logging.info("Hierarchical workflow is experimental and may be unstable.")
-        else:
-            raise ValueError(f"Unsupported workflow type: {workflow_type}")
-
-        print(f"✓ {workflow_type} workflow created")
-    except Exception as e:
-        print(f"✗ Error creating workflow: {e}")
+        result = asyncio.run(run_workflow(config, args.task, llm_client, llm_defaults, client_options, search_future))
+    finally:
+        http_client.close()
+    if result is None:
+        # Indexing may still be running; its daemon thread ends with the process
+        search_future.cancel()
         sys.exit(1)
 
-    # Execute workflow
-    print(f"\nExecuting workflow with task: {args.task}")
+    print("\n" + "=" * 80)
+    print("RESULT:")
+    print("=" * 80)
+    print(result["result"])
+    print("\n" + "=" * 80)
+    print(f"Token usage: {result['usage']}")
+    print(f"Number of steps: {len(result['execution_log'])}")
     print("=" * 80)
-    try:
-        data = {
-            "log_source": config["data"]["log_source"],
-            "intent_source": config["data"].get("intent_source")
-        }
-
-        result = workflow.execute(args.task, data)
-
-        print("\n" + "=" * 80)
-        print("RESULT:")
-        print("=" * 80)
-        print(result["result"])
-        print("\n" + "=" * 80)
-        print(f"Token usage: {result['usage']}")
-        print(f"Number of steps: {len(result['execution_log'])}")
-        print("=" * 80)
-
-    except Exception as e:
-        print(f"\n✗ Error executing workflow: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
 
     # Save results - single comprehensive JSON file with timestamp
     output_dir = config["evaluation"]["output_dir"]
     os.makedirs(output_dir, exist_ok=True)
 
     # Create filename with timestamp (using the experiment timestamp)
-    timestamp = config["experiment"]["timestamp"].replace(":", "-").replace(".", "-")
+    timestamp = config["experiment"]["timestamp"].translate(_TIMESTAMP_TRANS)
     experiment_name = config["experiment"]["name"]
     result_file = os.path.join(output_dir, f"{experiment_name}_{timestamp}.json")
 
     print(f"\nSaving results to: {result_file}")
 
     # Sanitize config for JSON serialization (remove API key)
-    config_for_saving = config.copy()
-    if "api_key" in config_for_saving["llm"]:
-        config_for_saving["llm"]["api_key"] = "***REDACTED***"
+    config_for_saving = sanitize_config(config)
 
     # Build comprehensive result document
     experiment_result = {
@@ -227,11 +370,12 @@ def main():
     }
 
     # Save as single JSON file
-    with open(result_file, 'w') as f:
-        json.dump(experiment_result, f, indent=2)
+    payload = dump_json(experiment_result)
+    with open(result_file, 'wb') as f:
+        f.write(payload)
 
     print(f"  ✓ Complete experiment data saved to: {result_file}")
-    print(f"  ✓ File size: {os.path.getsize(result_file)} bytes")
+    print(f"  ✓ File size: {len(payload)} bytes")
     print("\n✓ Experiment completed successfully!")
 
 
@@ -2,11 +2,84 @@
 Agent implementation with LLM interaction and tool execution.
 """
 
+import asyncio
+import atexit
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+import functools
 import importlib
-from typing import List, Dict, Optional, Callable, Any
+import inspect
+import os
+import threading
+from typing import List, Dict, Optional, Callable, Any, Iterator
 import json
-from datetime import datetime
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, fall back to the stdlib encoder
+    orjson = None
+
+
+def _dumps(obj: Any, indent: bool = False) -> str:
+    """Encode an object as JSON, compact or indented by two spaces."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    if indent:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=(",", ":"))
+
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+# Process-wide tool executors, keyed by worker count
+_TOOL_EXECUTORS: Dict[int, ThreadPoolExecutor] = {}
+_TOOL_EXECUTORS_LOCK = threading.Lock()
+
+
+def _tool_concurrency_limit(limit: Optional[int]) -> int:
+    """Resolve a configured tool concurrency limit, defaulting to the environment."""
+    if limit is None:
+        limit = int(os.getenv("TOOL_CONCURRENCY_LIMIT", "8"))
+    return max(1, limit)
+
+
+def get_tool_executor(max_workers: Optional[int] = None) -> ThreadPoolExecutor:
+    """
+    Get the shared thread pool for executing tool calls.
+
+    Pools are created on first use and reused by all agents and runs, so
+    worker threads are not spun up per iteration. A tool that itself runs
+    agents should use a pool of a different size than its caller, so that
+    nested tool calls cannot wait on their own blocked workers.
+
+    Args:
+        max_workers: Pool size (None = TOOL_CONCURRENCY_LIMIT env var, default 8)
+
+    Returns:
+        Shared ThreadPoolExecutor
+    """
+    max_workers = _tool_concurrency_limit(max_workers)
+
+    with _TOOL_EXECUTORS_LOCK:
+        executor = _TOOL_EXECUTORS.get(max_workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+            _TOOL_EXECUTORS[max_workers] = executor
+        return executor
+
+
+@atexit.register
+def _shutdown_tool_executors():
+    for executor in _TOOL_EXECUTORS.values():
+        executor.shutdown(wait=False)
+
 
 @dataclass
 class AgentConfig:
@@ -26,6 +99,19 @@ class AgentConfig:
     max_iterations: int = 5
     temperature: Optional[float] = None
 
+    # In arun(), start the next LLM call while tools run when all tool calls
+    # repeat earlier calls of the run (their results are predicted from those)
+    speculative: bool = False
+
+    # Maximum number of tool calls from one LLM response executed concurrently
+    # (None = TOOL_CONCURRENCY_LIMIT env var, default 8)
+    tool_concurrency_limit: Optional[int] = None
+
+    # Append every tool call and its result to this JSONL file; the run's
+    # returned tool_calls then only keeps the last tool_call_log_tail calls
+    tool_call_log_path: Optional[str] = None
+    tool_call_log_tail: int = 100
+
     # Structured output settings
     structured_output: Optional[Dict[str, Any]] = field(default=None)
     
@@ -62,13 +148,27 @@ class Agent:
         self.client = llm_client
         self.tool_registry = tool_registry
         self.history: List[Dict] = []
+        self._logged_len = 0  # Messages of the current run already in history
 
         # Validate that all configured tools exist
         for tool_name in config.tools:
             if tool_name not in tool_registry:
                 raise ValueError(f"Tool '{tool_name}' not found in registry")
 
-    def run(self, message: str, context: Optional[Dict] = None) -> Dict[str, Any]:
+        # Schemas and functions of the configured tools are fixed for the agent's lifetime
+        self._tool_schemas = [tool_registry[t]["schema"] for t in config.tools] or None
+        self._tool_funcs: Dict[str, Callable] = {t: tool_registry[t]["function"] for t in config.tools}
+
+        # Resolve the structured output schema up front so config errors surface at startup
+        self._structured_schema = None
+        if self._requires_structured_output():
+            schema_name = config.structured_output.get("schema")
+            schemas = importlib.import_module("evaluation.schemas")
+            if not hasattr(schemas, schema_name):
+                raise ValueError(f"Unknown structured output schema: {schema_name}")
+            self._structured_schema = getattr(schemas, schema_name)
+
+    def run(self, message: str, context: Optional[Dict] = None, cache_prefix: Optional[str] = None) -> Dict[str, Any]:
         """
         Execute agent on a message with optional context.
 
@@ -77,6 +177,8 @@ class Agent:
         Args:
             message: User message/task
             context: Optional context dict (e.g., from previous agents)
+            cache_prefix: Optional text shared with other agents' runs, sent
+                          as a prompt-cached part of the system prompt
 
         Returns:
             Dict with:
@@ -85,24 +187,14 @@ class Agent:
             - usage: Token usage statistics
             - history: Full interaction history
         """
-        # Build initial messages
-        messages = []
-
-        # Add context if provided
-        if context:
-            context_text = self._format_context(context)
-            messages.append({
-                "role": "user",
-                "content": f"Context from previous steps:\n{context_text}\n\nTask: {message}"
-            })
-        else:
-            messages.append({"role": "user", "content": message})
+        messages = self._build_messages(message, context)
+        self._logged_len = 0
 
         # Prepare tool schemas
         tool_schemas = self._get_tool_schemas()
 
         # Track all tool calls for this run
-        all_tool_calls = []
+        all_tool_calls = self._new_tool_call_list()
         total_usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
 
         # Agentic loop: keep calling LLM until no more tool calls
@@ -110,79 +202,417 @@ class Agent:
         iteration = 0
         final_response = None
 
-        while iteration < max_iterations:
-            iteration += 1
+        # One handle for all of the run's tool call log writes
+        with self._open_tool_call_log() as tool_log:
+            while iteration < max_iterations:
+                iteration += 1
+
+                # Call LLM
+                response = self.client.complete(**self._completion_kwargs(messages, tool_schemas, cache_prefix))
+                self._record_response(response, iteration, messages, total_usage)
+
+                # Store this response as the currently last response
+                final_response = response
+
+                # If no tool calls, we're done
+                if not response["tool_calls"]:
+                    break
 
-            # Call LLM
-            response = self.client.complete(
-                model=self.config.model,
+                # Execute tool calls
+                # First, add the assistant message with tool calls
+                messages.append(self._assistant_message(response))
+
+                # Now execute tools and add results
+                all_tool_calls.extend(response["tool_calls"])
+                tool_messages = self._execute_tool_calls(response["tool_calls"])
+                messages.extend(tool_messages)
+                self._log_tool_calls(tool_log, iteration, response["tool_calls"], tool_messages)
+
+        # Check if structured output is required
+        if self._requires_structured_output():
+            return self._finalize_with_structured_output(
                 messages=messages,
-                system=self.config.system_prompt,
-                tools=tool_schemas if tool_schemas else None,
-                max_tokens=self.config.max_tokens,
-                temperature=self.config.temperature if self.config.temperature is not None else 0.0
+                final_response=final_response,
+                all_tool_calls=all_tool_calls,
+                total_usage=total_usage
             )
 
-            # Update token usage
-            total_usage["input_tokens"] += response["usage"]["input_tokens"]
-            total_usage["output_tokens"] += response["usage"]["output_tokens"]
-            total_usage["total_tokens"] += response["usage"]["total_tokens"]
+        return self._build_result(final_response, all_tool_calls, total_usage)
+
+    async def arun(
+        self,
+        message: str,
+        context: Optional[Dict] = None,
+        first_response: Optional[Dict] = None,
+        cache_prefix: Optional[str] = None,
+        on_text: Optional[Callable[[str], None]] = None,
+        on_tool_turn: Optional[Callable[[], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Async counterpart of run() that awaits the LLM instead of blocking.
 
-            # Log this interaction
-            self.history.append({
-                "timestamp": datetime.now().isoformat(),
+        Lets a workflow run several agents concurrently on one event loop.
+        Arguments and return value are the same as for run(), except:
+
+        Args:
+            first_response: Response to the first_request() of this run,
+                            obtained elsewhere (e.g. from a Batch API job);
+                            used instead of making the first LLM call
+            on_text: Called with response text as it is generated; LLM
+                     calls are streamed when set
+            on_tool_turn: Called when a response turns out to have tool
+                          calls, i.e. the text passed to on_text since the
+                          previous call is not the final answer
+        """
+        messages = self._build_messages(message, context)
+        self._logged_len = 0
+        tool_schemas = self._get_tool_schemas()
+
+        all_tool_calls = self._new_tool_call_list()
+        total_usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+        max_iterations = self.config.max_iterations
+        iteration = 0
+        final_response = None
+
+        # Speculation state: tool results seen in this run, and a next response
+        # that was computed while the tools ran
+        tool_memo: Dict[tuple, str] = {}
+        next_response = first_response
+        if self.config.speculative:
+            total_usage["speculative_hits"] = 0
+            total_usage["speculative_misses"] = 0
+
+        # One handle for all of the run's tool call log writes
+        with self._open_tool_call_log() as tool_log:
+            while iteration < max_iterations:
+                iteration += 1
+
+                if next_response is not None:
+                    response, next_response = next_response, None
+                    if on_text is not None and response["content"]:
+                        on_text(response["content"])
+                elif on_text is not None:
+                    response = await self.client.acomplete(
+                        **self._completion_kwargs(messages, tool_schemas, cache_prefix), on_text=on_text
+                    )
+                else:
+                    response = await self.client.acomplete(**self._completion_kwargs(messages, tool_schemas, cache_prefix))
+                self._record_response(response, iteration, messages, total_usage)
+                final_response = response
+
+                if not response["tool_calls"]:
+                    break
+
+                if on_tool_turn is not None:
+                    on_tool_turn()
+
+                messages.append(self._assistant_message(response))
+
+                all_tool_calls.extend(response["tool_calls"])
+
+                speculation = None
+                if self.config.speculative and iteration < max_iterations:
+                    predicted = self._predict_tool_messages(response["tool_calls"], tool_memo)
+                    if predicted is not None:
+                        speculation = asyncio.create_task(
+                            self.client.acomplete(**self._completion_kwargs(messages + predicted, tool_schemas, cache_prefix))
+                        )
+
+                tool_messages = await self._aexecute_tool_calls(response["tool_calls"])
+                messages.extend(tool_messages)
+                self._log_tool_calls(tool_log, iteration, response["tool_calls"], tool_messages)
+
+                for tool_call, tool_message in zip(response["tool_calls"], tool_messages):
+                    tool_memo[self._tool_call_key(tool_call)] = tool_message["content"]
+
+                if speculation is not None:
+                    next_response = await self._resolve_speculation(speculation, predicted == tool_messages, total_usage)
+
+        if self._requires_structured_output():
+            return await self._afinalize_with_structured_output(
+                messages=messages,
+                final_response=final_response,
+                all_tool_calls=all_tool_calls,
+                total_usage=total_usage
+            )
+
+        return self._build_result(final_response, all_tool_calls, total_usage)
+
+    def _new_tool_call_list(self):
+        """Collection for a run's tool calls, bounded when they are logged to disk."""
+        if self.config.tool_call_log_path:
+            return deque(maxlen=self.config.tool_call_log_tail)
+        return []
+
+    def _open_tool_call_log(self):
+        """Open the tool call log for appending (a None handle when not configured)."""
+        if not self.config.tool_call_log_path:
+            return contextlib.nullcontext()
+        return open(self.config.tool_call_log_path, "ab")
+
+    def _log_tool_calls(self, tool_log: Any, iteration: int, tool_calls: List[Dict], tool_messages: List[Dict]):
+        """Append an iteration's tool calls and results to the open tool call log, if any."""
+        if tool_log is None:
+            return
+
+        lines = [
+            _dumps({
+                "agent": self.config.name,
                 "iteration": iteration,
-                "messages": messages.copy(),
-                "response": response
+                "id": tool_call.get("id"),
+                "name": tool_call["name"],
+                "arguments": tool_call["arguments"],
+                "result": tool_message["content"]
+            }) + "\n"
+            for tool_call, tool_message in zip(tool_calls, tool_messages)
+        ]
+        tool_log.write("".join(lines).encode("utf-8"))
+        # Keep the log readable while the run continues
+        tool_log.flush()
+
+    def _tool_call_key(self, tool_call: Dict) -> tuple:
+        """Hashable identity of a tool call (name and arguments)."""
+        arguments = tool_call["arguments"]
+        return tool_call["name"], arguments if isinstance(arguments, str) else _dumps(arguments)
+
+    def _predict_tool_messages(self, tool_calls: List[Dict], tool_memo: Dict[tuple, str]) -> Optional[List[Dict]]:
+        """
+        Predict the tool messages of a response from identical earlier calls.
+
+        Only calls already made in this run are predicted, so speculation is
+        limited to repeated (typically read-only) tool calls.
+
+        Returns:
+            Predicted tool messages, or None if any call has not been seen
+        """
+        predicted = []
+        for tool_call in tool_calls:
+            content = tool_memo.get(self._tool_call_key(tool_call))
+            if content is None:
+                return None
+            predicted.append({
+                "role": "tool",
+                "tool_call_id": tool_call.get("id"),
+                "name": tool_call["name"],
+                "content": content
             })
+        return predicted
+
+    async def _resolve_speculation(self, speculation: asyncio.Task, hit: bool, total_usage: Dict) -> Optional[Dict]:
+        """
+        Keep a speculative completion if its predicted tool results were right.
+
+        Returns:
+            The speculative response on a hit, otherwise None (the next
+            iteration then makes the real call)
+        """
+        if hit:
+            try:
+                response = await speculation
+            except Exception:
+                response = None
+            if response is not None:
+                total_usage["speculative_hits"] += 1
+                return response
+
+        total_usage["speculative_misses"] += 1
+        if speculation.done() and not speculation.cancelled() and speculation.exception() is None:
+            # Wasted, but already paid for
+            usage = speculation.result()["usage"]
+            for key in ["input_tokens", "output_tokens", "total_tokens"]:
+                total_usage[key] += usage[key]
+        else:
+            speculation.cancel()
+        return None
+
+    def first_request(self, message: str, context: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Arguments of the first LLM call a run on this message would make.
+
+        Args:
+            message: User message/task
+            context: Optional context dict
+
+        Returns:
+            Keyword arguments for LLMClient.complete() / render_payload()
+        """
+        return self._completion_kwargs(self._build_messages(message, context), self._get_tool_schemas())
 
-            # Store this response as the currently last response
-            final_response = response
-
-            # If no tool calls, we're done
-            if not response["tool_calls"]:
-                break
-
-            # Execute tool calls
-            # First, add the assistant message with tool calls
-            # Convert our format to LiteLLM's expected format
-            litellm_tool_calls = []
-            for tc in response["tool_calls"]:
-                litellm_tool_calls.append({
-                    "id": tc.get("id"),
-                    "type": "function",
-                    "function": {
-                        "name": tc["name"],
-                        "arguments": tc["arguments"] if isinstance(tc["arguments"], str) else json.dumps(tc["arguments"])
-                    }
-                })
+    def _build_messages(self, message: str, context: Optional[Dict]) -> List[Dict]:
+        """Build the initial message list for a run."""
+        messages = []
 
+        # Add context if provided
+        if context:
+            context_text = self._format_context(context)
             messages.append({
-                "role": "assistant",
-                "content": response["content"] if response["content"] else None,
-                "tool_calls": litellm_tool_calls
+                "role": "user",
+                "content": f"Context from previous steps:\n{context_text}\n\nTask: {message}"
             })
+        else:
+            messages.append({"role": "user", "content": message})
+
+        return messages
 
-            # Now execute tools and add results
-            for tool_call in response["tool_calls"]:
-                tool_name = tool_call["name"]
-                all_tool_calls.append(tool_call)
-
-                # Execute tool
-                try:
-                    tool_result = self._execute_tool(tool_name, tool_call["arguments"])
-                    result_content = json.dumps(tool_result) if isinstance(tool_result, dict) else str(tool_result)
-                except Exception as e:
-                    result_content = f"Error executing tool: {str(e)}"
-
-                # Add tool result in LiteLLM format
-                messages.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call.get("id"),
-                    "name": tool_name,
-                    "content": result_content
-                })
+    def _completion_kwargs(
+        self,
+        messages: List[Dict],
+        tool_schemas: Optional[List[Dict]],
+        cache_prefix: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Arguments for one agentic-loop LLM call."""
+        kwargs = {
+            "model": self.config.model,
+            "messages": messages,
+            "system": self.config.system_prompt,
+            "tools": tool_schemas if tool_schemas else None,
+            "max_tokens": self.config.max_tokens,
+            "temperature": self.config.temperature if self.config.temperature is not None else 0.0
+        }
+        if cache_prefix:
+            kwargs["cache_prefix"] = cache_prefix
+        return kwargs
+
+    def _record_response(self, response: Dict, iteration: Any, messages: List[Dict], total_usage: Dict):
+        """Add a response's token usage to the totals and log the interaction."""
+        total_usage["input_tokens"] += response["usage"]["input_tokens"]
+        total_usage["output_tokens"] += response["usage"]["output_tokens"]
+        total_usage["total_tokens"] += response["usage"]["total_tokens"]
+
+        # Only log the messages added since the previous entry of this run;
+        # reconstruct_messages() rebuilds the full list
+        self.history.append({
+            "timestamp_ns": time.time_ns(),
+            "iteration": iteration,
+            "messages_delta": messages[self._logged_len:],
+            "response": response
+        })
+        self._logged_len = len(messages)
+
+    def history_iter(self, iso: bool = True) -> Iterator[Dict]:
+        """
+        Iterate over history records.
+
+        Timestamps are recorded as integer nanoseconds and only formatted here.
+
+        Args:
+            iso: Replace "timestamp_ns" with an ISO 8601 (UTC) "timestamp"
 
+        Yields:
+            History records (copies when iso is set)
+        """
+        for record in self.history:
+            if not iso:
+                yield record
+                continue
+            formatted = {"timestamp": datetime.fromtimestamp(record["timestamp_ns"] / 1e9, tz=timezone.utc).isoformat()}
+            formatted.update((k, v) for k, v in record.items() if k != "timestamp_ns")
+            yield formatted
+
+    def reconstruct_messages(self, up_to_iteration: Any) -> List[Dict]:
+        """
+        Rebuild the messages sent to the LLM at an iteration of the latest run.
+
+        Args:
+            up_to_iteration: Iteration number, or "synthesis"
+
+        Returns:
+            Full message list of that LLM call
+        """
+        # The latest run starts at its last first-iteration entry
+        start = 0
+        for index, entry in enumerate(self.history):
+            if entry["iteration"] == 1:
+                start = index
+
+        messages = []
+        for entry in self.history[start:]:
+            messages.extend(entry["messages_delta"])
+            if entry["iteration"] == up_to_iteration:
+                return messages
+
+        raise ValueError(f"Iteration {up_to_iteration} not found in history")
+
+    def _assistant_message(self, response: Dict) -> Dict[str, Any]:
+        """Convert a response with tool calls to LiteLLM's assistant message format."""
+        litellm_tool_calls = []
+        for tc in response["tool_calls"]:
+            litellm_tool_calls.append({
+                "id": tc.get("id"),
+                "type": "function",
+                "function": {
+                    "name": tc["name"],
+                    # Provider strings are passed through, parsed arguments encoded compactly
+                    "arguments": tc["arguments"] if isinstance(tc["arguments"], str) else _dumps(tc["arguments"])
+                }
+            })
+
+        return {
+            "role": "assistant",
+            "content": response["content"] if response["content"] else None,
+            "tool_calls": litellm_tool_calls
+        }
+
+    def _execute_tool_calls(self, tool_calls: List[Dict]) -> List[Dict[str, Any]]:
+        """
+        Execute the tool calls of one response concurrently.
+
+        Tool calls are independent and mostly I/O-bound, so they run on the
+        shared tool executor of tool_concurrency_limit workers. Tool messages
+        are returned in the order of the calls.
+        """
+        if len(tool_calls) <= 1:
+            return [self._tool_message(tool_call) for tool_call in tool_calls]
+
+        executor = get_tool_executor(self.config.tool_concurrency_limit)
+        return list(executor.map(self._tool_message, tool_calls))
+
+    async def _aexecute_tool_calls(self, tool_calls: List[Dict]) -> List[Dict[str, Any]]:
+        """Async counterpart of _execute_tool_calls() using asyncio.gather."""
+        semaphore = asyncio.Semaphore(_tool_concurrency_limit(self.config.tool_concurrency_limit))
+
+        async def run_one(tool_call):
+            async with semaphore:
+                return await self._aexecute_tool(tool_call["name"], tool_call["arguments"])
+
+        results = await asyncio.gather(*(run_one(tc) for tc in tool_calls), return_exceptions=True)
+
+        return [
+            self._tool_result_message(tool_call, result)
+            for tool_call, result in zip(tool_calls, results)
+        ]
+
+    def _tool_message(self, tool_call: Dict) -> Dict[str, Any]:
+        """Execute a tool call and wrap its result as a LiteLLM tool message."""
+        try:
+            tool_result = self._execute_tool(tool_call["name"], tool_call["arguments"])
+        except Exception as e:
+            tool_result = e
+
+        return self._tool_result_message(tool_call, tool_result)
+
+    def _tool_result_message(self, tool_call: Dict, tool_result: Any) -> Dict[str, Any]:
+        """Wrap a tool result, or the exception it raised, as a LiteLLM tool message."""
+        tool_name = tool_call["name"]
+
+        if isinstance(tool_result, Exception):
+            result_content = f"Error executing tool: {str(tool_result)}"
+        else:
+            try:
+                result_content = _dumps(tool_result) if isinstance(tool_result, dict) else str(tool_result)
+            except Exception as e:
+                result_content = f"Error executing tool: {str(e)}"
+
+        return {
+            "role": "tool",
+            "tool_call_id": tool_call.get("id"),
+            "name": tool_name,
+            "content": result_content
+        }
+
+    def _build_result(self, final_response: Optional[Dict], all_tool_calls: List, total_usage: Dict) -> Dict[str, Any]:
+        """Build the unstructured result dict of a run."""
         # If we hit max iterations without a last response
         if final_response is None:
             final_response = {
@@ -190,45 +620,26 @@ class Agent:
                 "tool_calls": [],
                 "usage": {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
             }
-        
-        # Check if structured output is required
-        if self._requires_structured_output():
-            return self._finalize_with_structured_output(
-                messages=messages,
-                final_response=final_response,
-                all_tool_calls=all_tool_calls,
-                total_usage=total_usage
-            )
-        
-        # Return unstructured
+
         return {
             "content": final_response["content"],
-            "tool_calls": all_tool_calls,
+            "tool_calls": list(all_tool_calls),
             "usage": total_usage,
-            "history": self.history
+            "history": list(self.history_iter())
         }
 
     def _format_context(self, context: Dict) -> str:
         """Format context dict into readable text."""
-        lines = []
-        for key, value in context.items():
-            if isinstance(value, (dict, list)):
-                lines.append(f"{key}: {json.dumps(value, indent=2)}")
-            else:
-                lines.append(f"{key}: {value}")
-        return "\n".join(lines)
+        return "\n".join([
+            # Strings (e.g. previous agents' outputs) are the common case
+            f"{key}: {value}" if type(value) is str or not isinstance(value, (dict, list))
+            else f"{key}: {_dumps(value, indent=True)}"
+            for key, value in context.items()
+        ])
 
     def _get_tool_schemas(self) -> Optional[List[Dict]]:
         """Get tool schemas for configured tools."""
-        if not self.config.tools:
-            return None
-
-        schemas = []
-        for tool_name in self.config.tools:
-            if tool_name in self.tool_registry:
-                schemas.append(self.tool_registry[tool_name]["schema"])
-
-        return schemas if schemas else None
+        return self._tool_schemas
 
     def _execute_tool(self, tool_name: str, arguments: str) -> Any:
         """
@@ -241,21 +652,43 @@ class Agent:
         Returns:
             Tool execution result
         """
-        if tool_name not in self.tool_registry:
+        if tool_name not in self._tool_funcs:
             raise ValueError(f"Tool '{tool_name}' not found")
 
         # Parse arguments
         try:
-            args = json.loads(arguments) if isinstance(arguments, str) else arguments
+            args = _loads(arguments) if isinstance(arguments, str) else arguments
         except json.JSONDecodeError:
             raise ValueError(f"Invalid JSON arguments: {arguments}")
 
         # Get tool function
-        tool_func = self.tool_registry[tool_name]["function"]
+        tool_func = self._tool_funcs[tool_name]
 
         # Execute tool
         return tool_func(**args)
 
+    async def _aexecute_tool(self, tool_name: str, arguments: str) -> Any:
+        """
+        Async counterpart of _execute_tool().
+
+        Coroutine tool functions are awaited directly, blocking ones run on
+        the shared tool executor so they do not stall the event loop.
+        """
+        if tool_name not in self._tool_funcs:
+            raise ValueError(f"Tool '{tool_name}' not found")
+
+        try:
+            args = _loads(arguments) if isinstance(arguments, str) else arguments
+        except json.JSONDecodeError:
+            raise ValueError(f"Invalid JSON arguments: {arguments}")
+
+        tool_func = self._tool_funcs[tool_name]
+
+        if inspect.iscoroutinefunction(tool_func):
+            return await tool_func(**args)
+        executor = get_tool_executor(self.config.tool_concurrency_limit)
+        return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(tool_func, **args))
+
     def _requires_structured_output(self) -> bool:
         """Check if this agent is configured for structured output."""
         if not self.config.structured_output:
@@ -275,43 +708,61 @@ class Agent:
         This is called at the end of the agent loop to format the final response
         according to the specified schema.
         """
+        synthesis_messages = self._synthesis_messages(messages)
+
+        # Make structured completion call
+        structured_response = self.client.complete(**self._synthesis_kwargs(synthesis_messages))
 
-        schemas = importlib.import_module("evaluation.schemas")
-        schema = getattr(schemas, self.config.structured_output.get("schema"))
+        return self._build_structured_result(structured_response, synthesis_messages, all_tool_calls, total_usage)
 
-        # Add synthesis instruction
+    async def _afinalize_with_structured_output(
+        self,
+        messages: List[Dict],
+        final_response: Dict,
+        all_tool_calls: List,
+        total_usage: Dict
+    ) -> Dict[str, Any]:
+        """Async counterpart of _finalize_with_structured_output()."""
+        synthesis_messages = self._synthesis_messages(messages)
+
+        structured_response = await self.client.acomplete(**self._synthesis_kwargs(synthesis_messages))
+
+        return self._build_structured_result(structured_response, synthesis_messages, all_tool_calls, total_usage)
+
+    def _synthesis_messages(self, messages: List[Dict]) -> List[Dict]:
+        """Conversation plus the instruction to produce the structured response."""
         synthesis_messages = messages.copy()
         synthesis_messages.append({
             "role": "user",
             "content": "Based on your analysis above, provide your final response in the required structured format."
         })
-        
-        # Make structured completion call
-        structured_response = self.client.complete(
-            model=self.config.model,
-            messages=synthesis_messages,
-            system=self.config.system_prompt,
-            json_schema=schema,
-            max_tokens=self.config.max_tokens,
-            temperature=0.0  # Force deterministic for structured output
-        )
-        
-        # Update usage
-        total_usage["input_tokens"] += structured_response["usage"]["input_tokens"]
-        total_usage["output_tokens"] += structured_response["usage"]["output_tokens"]
-        total_usage["total_tokens"] += structured_response["usage"]["total_tokens"]
-        
-        # Log the synthesis step
-        self.history.append({
-            "timestamp": datetime.now().isoformat(),
-            "iteration": "synthesis",
+        return synthesis_messages
+
+    def _synthesis_kwargs(self, synthesis_messages: List[Dict]) -> Dict[str, Any]:
+        """Arguments for the structured synthesis LLM call."""
+        return {
+            "model": self.config.model,
             "messages": synthesis_messages,
-            "response": structured_response
-        })
+            "system": self.config.system_prompt,
+            "json_schema": self._structured_schema,
+            "max_tokens": self.config.max_tokens,
+            "temperature": 0.0  # Force deterministic for structured output
+        }
+
+    def _build_structured_result(
+        self,
+        structured_response: Dict,
+        synthesis_messages: List[Dict],
+        all_tool_calls: List,
+        total_usage: Dict
+    ) -> Dict[str, Any]:
+        """Record the synthesis step and build the structured result dict."""
+        # Update usage and log the synthesis step
+        self._record_response(structured_response, "synthesis", synthesis_messages, total_usage)
         
         # Parse structured data from response
         try:
-            structured_data = json.loads(structured_response["content"])
+            structured_data = _loads(structured_response["content"])
         except json.JSONDecodeError as e:
             # If parsing fails, include error info
             structured_data = {
@@ -322,24 +773,7 @@ class Agent:
         return {
             "content": structured_response["content"],
             "structured_data": structured_data,
-            "tool_calls": all_tool_calls,
+            "tool_calls": list(all_tool_calls),
             "usage": total_usage,
-            "history": self.history
+            "history": list(self.history_iter())
         }
-
-    # def _get_json_schema(self, schema_name: str) -> Dict:
-    #     """Convert Pydantic model name to JSON schema."""
-    #     from evaluation.schemas import StructuredAnalysis, AnomalyDetectionOutput
-        
-    #     schema_map = {
-    #         "StructuredAnalysis": StructuredAnalysis,
-    #         "AnomalyDetectionOutput": AnomalyDetectionOutput,
-    #     }
-        
-    #     if schema_name not in schema_map:
-    #         raise ValueError(
-    #             f"Unknown schema: {schema_name}. "
-    #             f"Available schemas: {list(schema_map.keys())}"
-    #         )
-        
-    #     return schema_map[schema_name].model_json_schema()
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+Batch execution of independent agents.
+
+Agents that do not depend on each other's output (e.g. a parallel group of
+a sequential workflow) can either run concurrently, or have their first LLM
+turn submitted together through the provider's Batch API, which is cheaper
+and has higher throughput at the cost of latency.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+from typing import List, Dict, Optional, Any, Tuple
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, fall back to the stdlib encoder
+    orjson = None
+
+
+# Batch statuses after which no results will arrive
+_FAILED_BATCH_STATUSES = {"failed", "expired", "cancelled", "cancelling"}
+
+
+class BatchProcessor:
+    """Run a set of independent agents, optionally via the provider Batch API."""
+
+    def __init__(
+        self,
+        client: Any,
+        max_concurrency: Optional[int] = None,
+        rate_limit_per_min: Optional[int] = None,
+        use_batch_api: bool = False,
+        poll_interval: float = 30.0
+    ):
+        """
+        Initialize batch processor.
+
+        Args:
+            client: LLMClient used to submit and poll batches
+            max_concurrency: Maximum number of agents running at once (None = unlimited)
+            rate_limit_per_min: Maximum number of agent runs started per minute (None = unlimited)
+            use_batch_api: Submit the agents' first LLM turn as one provider batch
+            poll_interval: Seconds between batch status checks
+        """
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.rate_limit_per_min = rate_limit_per_min
+        self.use_batch_api = use_batch_api
+        self.poll_interval = poll_interval
+
+    async def run(self, jobs: List[Tuple[Any, str, Optional[Dict]]]) -> List[Dict[str, Any]]:
+        """
+        Run agents on their tasks.
+
+        Args:
+            jobs: List of (agent, task, context) tuples
+
+        Returns:
+            Agent results, in the order of jobs
+        """
+        if self.use_batch_api and len(jobs) > 1:
+            first_responses = await self._batch_first_turns(jobs)
+        else:
+            first_responses = [None] * len(jobs)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+        interval = 60.0 / self.rate_limit_per_min if self.rate_limit_per_min else 0.0
+
+        async def run_one(index, agent, task, context, first_response):
+            # Spread agent starts evenly over the minute
+            if interval:
+                await asyncio.sleep(index * interval)
+            if semaphore is None:
+                return await agent.arun(task, context=context, first_response=first_response)
+            async with semaphore:
+                return await agent.arun(task, context=context, first_response=first_response)
+
+        return await asyncio.gather(*(
+            run_one(index, agent, task, context, first_response)
+            for index, ((agent, task, context), first_response) in enumerate(zip(jobs, first_responses))
+        ))
+
+    async def _batch_first_turns(self, jobs: List[Tuple[Any, str, Optional[Dict]]]) -> List[Dict[str, Any]]:
+        """Submit the first LLM turn of every agent as one batch and wait for it."""
+        lines = []
+        for index, (agent, task, context) in enumerate(jobs):
+            if agent.client.provider != self.client.provider:
+                raise ValueError(
+                    f"Agent '{agent.config.name}' uses provider '{agent.client.provider}', "
+                    f"batch provider is '{self.client.provider}'"
+                )
+            kwargs = agent.first_request(task, context)
+            lines.append(agent.client.render_payload(custom_id=f"job-{index}", **kwargs))
+
+        fd, jsonl_path = tempfile.mkstemp(suffix=".jsonl", prefix="batch_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for line in lines:
+                    if orjson is not None:
+                        f.write(orjson.dumps(line, option=orjson.OPT_APPEND_NEWLINE))
+                    else:
+                        f.write(json.dumps(line).encode("utf-8") + b"\n")
+
+            batch_id = await asyncio.to_thread(self.client.submit_batch, jsonl_path)
+        finally:
+            os.remove(jsonl_path)
+
+        while True:
+            status = await asyncio.to_thread(self.client.poll_batch, batch_id)
+            if status == "completed":
+                break
+            if status in _FAILED_BATCH_STATUSES:
+                raise RuntimeError(f"Batch {batch_id} ended with status '{status}'")
+            await asyncio.sleep(self.poll_interval)
+
+        results = await asyncio.to_thread(self.client.fetch_results, batch_id)
+
+        # Requests that failed inside the batch are retried normally by the agent
+        return [results.get(f"job-{index}") for index in range(len(jobs))]
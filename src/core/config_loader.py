@@ -2,12 +2,123 @@
 Configuration loader for experiment YAML files.
 """
 
+import copy
+import functools
+import glob
 import yaml
 import os
-from typing import Dict, Any
+import json
+from typing import Dict, Any, Callable
 from datetime import datetime
 from dotenv import load_dotenv
 
+# Prefer the libyaml-backed loader, fall back to the pure-Python one
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+_REQUIRED_SECTIONS = frozenset({"experiment", "llm", "workflow", "agents", "data"})
+_REQUIRED_AGENT_FIELDS = frozenset({"system_prompt", "tools"})
+
+
+def _read_config_file(config_path: str) -> Dict[str, Any]:
+    """
+    Read a YAML config file, memoized in-process by path, mtime and size.
+
+    Returns a deep copy, so callers may modify the config freely.
+
+    Args:
+        config_path: Path to YAML config file
+
+    Returns:
+        Parsed (unvalidated) configuration dict
+    """
+    stat = os.stat(config_path)
+    return copy.deepcopy(_parse_config_file(config_path, stat.st_mtime_ns, stat.st_size))
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_config_file(config_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    Parse a YAML config file, using a JSON sidecar cache when it is fresh.
+
+    The sidecar is named after the config file's mtime (in nanoseconds) and
+    size, so editing the YAML invalidates it automatically; sidecars of
+    earlier versions are removed when a new one is written. Configs that
+    JSON cannot represent losslessly (e.g. non-string keys) are not cached,
+    and failing to write the sidecar is not fatal.
+
+    Args:
+        config_path: Path to YAML config file
+        mtime_ns: Modification time of the file in nanoseconds (part of the cache key)
+        size: Size of the file in bytes (part of the cache key)
+
+    Returns:
+        Parsed (unvalidated) configuration dict, shared between callers
+    """
+    cache_path = f"{config_path}.{mtime_ns}-{size}.cache.json"
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass  # Corrupt or unreadable sidecar, fall back to YAML
+
+    with open(config_path, 'r') as f:
+        config = yaml.load(f, Loader=_YamlLoader)
+
+    try:
+        payload = json.dumps(config)
+        # JSON turns non-string keys (and tuples etc.) into something else,
+        # only cache configs that survive the round trip unchanged
+        if json.loads(payload) == config:
+            with open(cache_path, 'w') as f:
+                f.write(payload)
+    except (OSError, TypeError, ValueError):
+        # Read-only directory or YAML values without a JSON equivalent
+        pass
+
+    # Sidecars of earlier versions of the file will never be read again
+    for stale_path in glob.glob(f"{glob.escape(config_path)}.*.cache.json"):
+        if stale_path != cache_path:
+            try:
+                os.remove(stale_path)
+            except OSError:
+                pass
+
+    return config
+
+
+def _resolve_anthropic(llm_config: Dict[str, Any]) -> None:
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise ValueError("ANTHROPIC_API_KEY not found in environment")
+    llm_config["api_key"] = api_key
+
+
+def _resolve_openai(llm_config: Dict[str, Any]) -> None:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not found in environment")
+    llm_config["api_key"] = api_key
+
+
+def _resolve_ollama(llm_config: Dict[str, Any]) -> None:
+    # Ollama doesn't require API key
+    llm_config["api_key"] = None
+    # Set base URL from env or default
+    llm_config["base_url"] = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+
+
+# Provider name -> function filling in the llm section's credentials and endpoint
+_PROVIDER_RESOLVERS: Dict[str, Callable[[Dict[str, Any]], None]] = {
+    "anthropic": _resolve_anthropic,
+    "openai": _resolve_openai,
+    "ollama": _resolve_ollama,
+}
+
 
 def load_config(config_path: str) -> Dict[str, Any]:
     """
@@ -30,14 +141,12 @@ def load_config(config_path: str) -> Dict[str, Any]:
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"Config file not found: {config_path}")
 
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+    config = _read_config_file(config_path)
 
     # Validate required top-level keys
-    required_keys = ["experiment", "llm", "workflow", "agents", "data"]
-    for key in required_keys:
-        if key not in config:
-            raise ValueError(f"Missing required config section: {key}")
+    missing = _REQUIRED_SECTIONS - config.keys()
+    if missing:
+        raise ValueError(f"Missing required config sections: {sorted(missing)}")
 
     # Generate timestamp if not provided
     if config["experiment"].get("timestamp") is None:
@@ -45,23 +154,19 @@ def load_config(config_path: str) -> Dict[str, Any]:
 
     # Resolve API keys from environment
     provider = config["llm"]["provider"]
-    if provider == "anthropic":
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY not found in environment")
-        config["llm"]["api_key"] = api_key
-    elif provider == "openai":
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not found in environment")
-        config["llm"]["api_key"] = api_key
-    elif provider == "ollama":
-        # Ollama doesn't require API key
-        config["llm"]["api_key"] = None
-        # Set base URL from env or default
-        config["llm"]["base_url"] = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-    else:
+    resolver = _PROVIDER_RESOLVERS.get(provider)
+    if resolver is None:
         raise ValueError(f"Unsupported LLM provider: {provider}")
+    resolver(config["llm"])
+
+    # Validate optional semantic response cache
+    semantic_cache = config["llm"].get("semantic_cache")
+    if semantic_cache is not None:
+        if not isinstance(semantic_cache, dict) or not semantic_cache.get("embedding_model"):
+            raise ValueError("llm.semantic_cache requires an embedding_model")
+        threshold = semantic_cache.get("threshold", 0.90)
+        if not isinstance(threshold, (int, float)) or not 0 < threshold <= 1:
+            raise ValueError("llm.semantic_cache.threshold must be in (0, 1]")
 
     # Validate workflow configuration
     workflow_type = config["workflow"]["type"]
@@ -77,12 +182,51 @@ def load_config(config_path: str) -> Dict[str, Any]:
         if agent_name not in config["agents"]:
             raise ValueError(f"Agent '{agent_name}' in sequence not found in agents config")
 
-    # Validate each agent has required fields
+    # Validate optional parallel groups: consecutive groups covering agent_sequence
+    parallel_groups = config["workflow"].get("parallel_groups")
+    if parallel_groups is not None:
+        flattened = [name for group in parallel_groups for name in group]
+        if flattened != config["workflow"]["agent_sequence"] or not all(parallel_groups):
+            raise ValueError(
+                "workflow.parallel_groups must split agent_sequence into consecutive, non-empty groups"
+            )
+        # Agents keep per-run state, so one agent cannot run twice at once
+        for group in parallel_groups:
+            if len(set(group)) != len(group):
+                raise ValueError(f"workflow.parallel_groups group {group} lists an agent more than once")
+
+    # Validate optional concurrency limit for hierarchical specialists
+    max_parallel = config["workflow"].get("max_parallel_specialists")
+    if max_parallel is not None and (not isinstance(max_parallel, int) or max_parallel < 1):
+        raise ValueError("workflow.max_parallel_specialists must be a positive integer")
+
+    # Validate optional batch execution of parallel groups
+    batch_config = config["workflow"].get("batch")
+    if batch_config is not None:
+        if not isinstance(batch_config, dict):
+            raise ValueError("workflow.batch must be a mapping")
+        for key in ["enabled", "use_batch_api"]:
+            if not isinstance(batch_config.get(key, False), bool):
+                raise ValueError(f"workflow.batch.{key} must be true or false")
+        for key in ["max_concurrency", "rate_limit"]:
+            value = batch_config.get(key)
+            if value is not None and (not isinstance(value, int) or value < 1):
+                raise ValueError(f"workflow.batch.{key} must be a positive integer")
+        if batch_config.get("use_batch_api") and provider == "ollama":
+            raise ValueError("workflow.batch.use_batch_api is not supported for provider 'ollama'")
+
+    # Set defaults for optional fields
+    if "max_iterations" not in config["workflow"]:
+        config["workflow"]["max_iterations"] = 10
+
+    if "temperature" not in config["llm"]:
+        config["llm"]["temperature"] = 0.0
+
+    # Validate each agent and set per-agent defaults
     for agent_name, agent_config in config["agents"].items():
-        if "system_prompt" not in agent_config:
-            raise ValueError(f"Agent '{agent_name}' missing system_prompt")
-        if "tools" not in agent_config:
-            raise ValueError(f"Agent '{agent_name}' missing tools list")
+        missing = _REQUIRED_AGENT_FIELDS - agent_config.keys()
+        if missing:
+            raise ValueError(f"Agent '{agent_name}' missing required fields: {sorted(missing)}")
         if "structured_output" in agent_config:
             so_config = agent_config["structured_output"]
             if so_config.get("enabled"):
@@ -92,15 +236,6 @@ def load_config(config_path: str) -> Dict[str, Any]:
                         f"Agent {agent_name}: structured_output.schema required when enabled"
                     )
 
-    # Set defaults for optional fields
-    if "max_iterations" not in config["workflow"]:
-        config["workflow"]["max_iterations"] = 10
-
-    if "temperature" not in config["llm"]:
-        config["llm"]["temperature"] = 0.0
-
-    # Set per-agent temperature defaults
-    for agent_name, agent_config in config["agents"].items():
         if "temperature" not in agent_config or agent_config["temperature"] is None:
             agent_config["temperature"] = config["llm"]["temperature"]
         if "max_tokens" not in agent_config:
@@ -109,6 +244,23 @@ def load_config(config_path: str) -> Dict[str, Any]:
     return config
 
 
+def sanitize_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return a copy of the config that is safe to save, with the API key redacted.
+
+    Only the "llm" section is copied; the original config is not modified.
+
+    Args:
+        config: Loaded configuration
+
+    Returns:
+        Configuration dict for serialization
+    """
+    if "api_key" not in config["llm"]:
+        return config
+    return {**config, "llm": {**config["llm"], "api_key": "***REDACTED***"}}
+
+
 def validate_data_sources(config: Dict[str, Any]) -> None:
     """
     Validate that data sources exist.
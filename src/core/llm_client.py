@@ -3,16 +3,263 @@ LLM Client for unified interface across multiple providers.
 Uses LiteLLM to support Anthropic, OpenAI, Ollama, and others.
 """
 
-from typing import List, Dict, Optional, Any
-import litellm
-import ollama
-from litellm import completion, get_supported_openai_params, supports_response_schema
+import asyncio
+import contextlib
+import copy
+import functools
+import hashlib
+import importlib.util
+import json
+import random
+import threading
+import time
+import unicodedata
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Any, Tuple, Callable
+import httpx
+
+from .response_cache import ResponseCache
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, fall back to the stdlib encoder
+    orjson = None
+
+# Provider errors worth retrying with backoff (rate limits and transient server errors)
+_RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+# Request fields that do not affect the response, left out of cache keys
+_CACHE_IGNORED_KWARGS = {"api_base", "stream", "stream_options"}
+
+
+def _normalize_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Canonical form of a message for cache keys (NFC text, lowercase role)."""
+    normalized = dict(message)
+    normalized["role"] = str(message.get("role", "")).lower()
+    if isinstance(message.get("content"), str):
+        normalized["content"] = unicodedata.normalize("NFC", message["content"])
+    return normalized
+
+
+def _canonical_json(obj: Any) -> bytes:
+    """Sorted-key JSON encoding used for cache keys."""
+    # Schemas may be pydantic classes, which are keyed by their name
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS, default=str)
+    return json.dumps(obj, sort_keys=True, default=str).encode("utf-8")
+
+
+# Request fields that are usually the same object on every call of an agent
+_DIGESTED_KWARGS = ("tools", "response_format")
+
+# Endpoints to pre-warm for providers without a configured base URL
+_PROVIDER_BASE_URLS = {
+    "openai": "https://api.openai.com",
+    "anthropic": "https://api.anthropic.com",
+}
+
+
+def create_http_clients(
+    max_connections: int = 64,
+    max_keepalive_connections: int = 32,
+    keepalive_expiry: float = 60.0
+) -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    Create a pooled sync/async HTTP client pair to share between LLMClients.
+
+    Keep-alive connections avoid a TCP/TLS handshake per request; HTTP/2 is
+    enabled when the optional h2 package is installed.
+
+    Args:
+        max_connections: Maximum number of open connections per client
+        max_keepalive_connections: Maximum number of idle connections kept open
+        keepalive_expiry: Seconds an idle connection is kept open
+
+    Returns:
+        Tuple of (httpx.Client, httpx.AsyncClient)
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry
+    )
+    timeout = httpx.Timeout(60.0, connect=10.0)
+    http2 = importlib.util.find_spec("h2") is not None
+    return (
+        httpx.Client(limits=limits, timeout=timeout, http2=http2),
+        httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+    )
+
+
+@functools.cache
+def _litellm():
+    """LiteLLM, imported on first use (it takes seconds to import)."""
+    import litellm
+    return litellm
+
+
+@functools.cache
+def _ollama():
+    """Ollama client library, imported on first use."""
+    import ollama
+    return ollama
+
+
+@functools.lru_cache(maxsize=128)
+def _ollama_capabilities(base_url: Optional[str], model: str) -> Tuple[str, ...]:
+    """Capabilities of an Ollama model (one round-trip to the daemon per model)."""
+    ollama = _ollama()
+    client = ollama.Client(host=base_url) if base_url else ollama
+    return tuple(client.show(model).capabilities or ())
+
+
+@functools.lru_cache(maxsize=128)
+def _structured_output_support(provider: str, model: str) -> bool:
+    """Whether a provider/model pair supports structured output via JSON schema."""
+    if "ollama" in provider.lower():
+        # Assume all Ollama models support structured output
+        return True
+
+    litellm = _litellm()
+    params = litellm.get_supported_openai_params(model, custom_llm_provider=provider)
+    if "response_format" in params:
+        return litellm.supports_response_schema(model, custom_llm_provider=provider)
+    return False
+
+
+@functools.lru_cache(maxsize=128)
+def _litellm_model_name(provider: str, model: str) -> str:
+    """Model name as passed to LiteLLM (Ollama models get the ollama_chat/ prefix)."""
+    if provider == "ollama" and not model.startswith("ollama/") and not model.startswith("ollama_chat/"):
+        return f"ollama_chat/{model}"
+    return model
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Seconds to wait before retry number attempt + 1 (exponential, with jitter)."""
+    return 2 ** attempt + random.random()
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether a provider error is a rate limit or transient server error."""
+    return getattr(error, "status_code", None) in _RETRY_STATUS_CODES
+
+
+class RateLimiter:
+    """
+    Concurrency, request and token limits over a one-minute sliding window.
+
+    Pass one instance to several LLMClients (rate_limiter=...) to make them
+    share the limits of one provider account. Limits apply to both
+    complete() and acomplete(); max_concurrent counts sync calls and the
+    calls of each event loop separately.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: Optional[int] = None,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_concurrent: Maximum concurrent requests (None = unlimited)
+            rpm: Maximum requests per minute (None = unlimited)
+            tpm: Maximum tokens per minute (None = unlimited)
+            clock: Monotonic time source in seconds
+        """
+        self.max_concurrent = max_concurrent
+        self.rpm = rpm
+        self.tpm = tpm
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._request_times: deque = deque()
+        self._token_log: deque = deque()  # (time, total_tokens) per response
+        self._thread_semaphore = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+
+    def slot(self):
+        """Concurrency guard for sync requests (no-op when unlimited)."""
+        return self._thread_semaphore or contextlib.nullcontext()
+
+    def aslot(self):
+        """Concurrency guard for the running event loop (no-op when unlimited)."""
+        if not self.max_concurrent:
+            return contextlib.nullcontext()
+
+        # asyncio primitives belong to one loop; recreate for each new loop
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def wait(self) -> None:
+        """Block until the window has request and token budget, then take a request."""
+        while True:
+            delay = self._reserve()
+            if not delay:
+                return
+            time.sleep(delay)
+
+    async def await_slot(self) -> None:
+        """Async counterpart of wait()."""
+        while True:
+            delay = self._reserve()
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+    def record_tokens(self, total_tokens: int) -> None:
+        """Count the tokens of a finished request against the tpm limit."""
+        with self._lock:
+            self._token_log.append((self._clock(), total_tokens))
+
+    def _reserve(self) -> float:
+        """Take a request from the window, or return the seconds to wait for one."""
+        with self._lock:
+            now = self._clock()
+            while self._request_times and now - self._request_times[0] >= 60:
+                self._request_times.popleft()
+            while self._token_log and now - self._token_log[0][0] >= 60:
+                self._token_log.popleft()
+
+            waits = []
+            if self.rpm and len(self._request_times) >= self.rpm:
+                waits.append(60 - (now - self._request_times[0]))
+            if self.tpm and sum(tokens for _, tokens in self._token_log) >= self.tpm:
+                waits.append(60 - (now - self._token_log[0][0]))
+
+            if not waits:
+                self._request_times.append(now)
+                return 0.0
+            return max(waits)
 
 
 class LLMClient:
     """Unified interface for multiple LLM providers using LiteLLM."""
 
-    def __init__(self, provider: str, api_key: Optional[str] = None, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        provider: str,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.Client] = None,
+        async_http_client: Optional[httpx.AsyncClient] = None,
+        max_concurrent: Optional[int] = None,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        max_retries: int = 3,
+        cache_size: int = 0,
+        cache_path: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None
+    ):
         """
         Initialize LLM client.
 
@@ -20,11 +267,50 @@ class LLMClient:
             provider: Provider name ('anthropic', 'openai', 'ollama')
             api_key: API key for the provider (optional for Ollama)
             base_url: Base URL for custom endpoints (mainly for Ollama)
+            http_client: Pooled HTTP client for sync requests (see create_http_clients)
+            async_http_client: Pooled HTTP client for async requests; its
+                               connections belong to the event loop that
+                               opened them, so use it within one asyncio.run()
+                               and aclose() it before that loop ends
+            max_concurrent: Maximum concurrent requests (None = unlimited)
+            rpm: Maximum requests per minute (None = unlimited)
+            tpm: Maximum tokens per minute (None = unlimited)
+            max_retries: Retries for rate-limited or failed requests
+            cache_size: Number of responses to keep in an LRU cache keyed by
+                        the normalized request (0 = no caching)
+            cache_path: SQLite file to persist the cache in across runs
+                        (None = in-memory only)
+            rate_limiter: Limiter shared with other clients; when given,
+                          max_concurrent, rpm and tpm are ignored
         """
         self.provider = provider
         self.api_key = api_key
         self.base_url = base_url
 
+        # Rate limiting, possibly shared with other clients
+        self.rate_limiter = rate_limiter or RateLimiter(max_concurrent, rpm, tpm)
+        self.max_retries = max_retries
+
+        # Response cache: request hash -> parsed response
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._response_cache = ResponseCache(cache_path, max_entries=cache_size) if cache_path and cache_size else None
+        # id -> (object, digest) of tool lists and schemas, see _digest()
+        self._digests: Dict[int, Tuple[Any, str]] = {}
+
+        # LiteLLM sends all requests through these sessions when set. They are
+        # process-wide, so only install them when asked to (and only once);
+        # otherwise LiteLLM keeps managing its own connections
+        litellm = _litellm()
+        if http_client is not None and litellm.client_session is not http_client:
+            litellm.client_session = http_client
+        if async_http_client is not None and litellm.aclient_session is not async_http_client:
+            litellm.aclient_session = async_http_client
+        self._http_client = http_client
+
+        # Per-model tool-support probes (Ollama needs a round-trip to find out)
+        self._tool_support: Dict[str, bool] = {}
+
         # Set up provider-specific configuration
         if provider == "anthropic" and api_key:
             litellm.api_key = api_key
@@ -34,6 +320,33 @@ class LLMClient:
             if base_url:
                 litellm.api_base = base_url
 
+    async def aconnect(self, model: str, prewarm: bool = False) -> None:
+        """
+        Run the blocking, network-touching setup for a model.
+
+        Probes tool support in a worker thread so that several clients can be
+        prepared concurrently; the result is reused by later completions.
+
+        Args:
+            model: Model identifier the client will be used with
+            prewarm: Also open a pooled connection to the provider endpoint,
+                     so the first completion skips the TCP/TLS handshake
+        """
+        if model not in self._tool_support:
+            self._tool_support[model] = await asyncio.to_thread(self._probe_tool_support, model)
+        if prewarm:
+            await asyncio.to_thread(self._prewarm)
+
+    def _prewarm(self) -> None:
+        """Open a keep-alive connection to the provider (failures are ignored)."""
+        base_url = self.base_url or _PROVIDER_BASE_URLS.get(self.provider)
+        if self._http_client is None or not base_url:
+            return
+        try:
+            self._http_client.head(base_url)
+        except httpx.HTTPError:
+            pass
+
     def complete(
         self,
         model: str,
@@ -42,7 +355,9 @@ class LLMClient:
         tools: Optional[List[Dict]] = None,
         json_schema: Optional[Dict] = None,
         max_tokens: int = 4096,
-        temperature: float = 0.0
+        temperature: float = 0.0,
+        bypass_cache: bool = False,
+        cache_prefix: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Make a completion request to the LLM.
@@ -54,6 +369,10 @@ class LLMClient:
             tools: List of tool definitions for function calling
             max_tokens: Maximum tokens in response
             temperature: Sampling temperature (0.0 = deterministic)
+            bypass_cache: Neither read nor write the response cache
+            cache_prefix: Prompt text shared by many requests (e.g. a plan
+                          handed to several agents), appended to the system
+                          prompt and marked for provider prompt caching
 
         Returns:
             Standardized response dict with keys:
@@ -62,60 +381,381 @@ class LLMClient:
             - usage: Token usage dict
         """
         try:
-            # Prepare arguments for litellm
-            kwargs = {
-                "model": model,
-                "messages": messages,
-                "max_tokens": max_tokens,
-                "temperature": temperature
-            }
+            kwargs = self._build_request(
+                model, messages, system, tools, json_schema, max_tokens, temperature, cache_prefix
+            )
 
-            # Add api_base for Ollama
-            if self.provider == "ollama" and self.base_url:
-                kwargs["api_base"] = self.base_url
-
-            # Add system prompt if provided
-            if system:
-                # For models that support system parameter
-                if self.provider in ["anthropic", "openai", "ollama"]:
-                    # Prepend system message to messages list
-                    kwargs["messages"] = [{"role": "system", "content": system}] + messages
-
-            # Add structured output if requested
-            if json_schema and self._supports_structured_output(model):
-                kwargs["response_format"] = json_schema
-                # kwargs["response_format"] = {
-                #     "type": "json_schema",
-                #     "json_schema": {
-                #         "name": "structured_response",
-                #         "strict": True,
-                #         "schema": json_schema
-                #     }
-                # }
-                # Note: Cannot use tools with structured output in most APIs
-                if tools:
-                    raise ValueError(
-                        "Cannot use tools with structured output. "
-                        "Structured output is only for final agent response."
-                    )
-            # Add tools if provided and model supports them
-            if tools and self._supports_tools(model):
-                kwargs["tools"] = tools
-                kwargs["tool_choice"] = "auto"
-
-            # For Ollama, prefix model name with "ollama/"
-            if self.provider == "ollama" and not model.startswith("ollama/") and not model.startswith("ollama_chat/"):
-                kwargs["model"] = f"ollama_chat/{model}"
+            cache_key = None if bypass_cache else self._cache_key(kwargs)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
 
             # Make the completion request
-            response = completion(**kwargs)
+            with self.rate_limiter.slot():
+                for attempt in range(self.max_retries + 1):
+                    self.rate_limiter.wait()
+                    try:
+                        response = _litellm().completion(**kwargs)
+                        break
+                    except Exception as e:
+                        if attempt == self.max_retries or not _is_retryable(e):
+                            raise
+                        time.sleep(_backoff_delay(attempt))
 
             # Parse and standardize the response
-            return self._parse_response(response)
+            parsed = self._parse_response(response)
+            self.rate_limiter.record_tokens(parsed["usage"]["total_tokens"])
+            self._cache_put(cache_key, parsed, model)
+            return parsed
+
+        except Exception as e:
+            raise Exception(f"LLM completion failed: {str(e)}")
+
+    async def acomplete(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        system: Optional[str] = None,
+        tools: Optional[List[Dict]] = None,
+        json_schema: Optional[Dict] = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.0,
+        bypass_cache: bool = False,
+        cache_prefix: Optional[str] = None,
+        on_text: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Async counterpart of complete(), awaiting litellm.acompletion.
+
+        Arguments and return value are the same as for complete(), plus:
+
+        Args:
+            on_text: Called with each piece of response text as it is
+                     generated; the response is streamed when set
+        """
+        try:
+            kwargs = self._build_request(
+                model, messages, system, tools, json_schema, max_tokens, temperature, cache_prefix
+            )
+
+            cache_key = None if bypass_cache else self._cache_key(kwargs)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                if on_text is not None and cached["content"]:
+                    on_text(cached["content"])
+                return cached
+
+            async with self.rate_limiter.aslot():
+                for attempt in range(self.max_retries + 1):
+                    await self.rate_limiter.await_slot()
+                    try:
+                        if on_text is None:
+                            response = await _litellm().acompletion(**kwargs)
+                        else:
+                            response = await self._astream(kwargs, on_text)
+                        break
+                    except Exception as e:
+                        if attempt == self.max_retries or not _is_retryable(e):
+                            raise
+                        await asyncio.sleep(_backoff_delay(attempt))
+
+            parsed = self._parse_response(response)
+            self.rate_limiter.record_tokens(parsed["usage"]["total_tokens"])
+            self._cache_put(cache_key, parsed, model)
+            return parsed
 
         except Exception as e:
             raise Exception(f"LLM completion failed: {str(e)}")
 
+    async def _astream(self, kwargs: Dict[str, Any], on_text: Callable[[str], None]) -> Any:
+        """Stream a completion, passing text deltas to on_text, and rebuild the full response."""
+        stream_kwargs = dict(kwargs, stream=True)
+        if self.provider == "openai":
+            # Usage is only reported in the final chunk on request
+            stream_kwargs["stream_options"] = {"include_usage": True}
+
+        litellm = _litellm()
+        chunks = []
+        async for chunk in await litellm.acompletion(**stream_kwargs):
+            chunks.append(chunk)
+            if chunk.choices and chunk.choices[0].delta.content:
+                on_text(chunk.choices[0].delta.content)
+
+        return litellm.stream_chunk_builder(chunks, messages=kwargs["messages"])
+
+    def complete_race(self, models: List[str], **kwargs) -> Dict[str, Any]:
+        """
+        Send the same request to several models at once and return the first success.
+
+        Every request is submitted before any result is awaited. Requests
+        still running when a winner is found complete in the background.
+
+        Args:
+            models: Model identifiers to race (LiteLLM provider-prefixed names
+                    let one client race models of different providers)
+            **kwargs: Other complete() arguments
+
+        Returns:
+            Response of the fastest successful model, with its "model" added
+        """
+        if not models:
+            raise ValueError("complete_race() requires at least one model")
+
+        executor = ThreadPoolExecutor(max_workers=len(models), thread_name_prefix="race")
+        futures = {executor.submit(self.complete, model=model, **kwargs): model for model in models}
+        try:
+            error = None
+            for future in as_completed(futures):
+                if future.exception() is None:
+                    return dict(future.result(), model=futures[future])
+                error = future.exception()
+            raise error
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def acomplete_race(self, models: List[str], **kwargs) -> Dict[str, Any]:
+        """
+        Async counterpart of complete_race(); requests that lose the race are cancelled.
+
+        Arguments and return value are the same as for complete_race().
+        """
+        if not models:
+            raise ValueError("acomplete_race() requires at least one model")
+
+        tasks = {asyncio.create_task(self.acomplete(model=model, **kwargs)): model for model in models}
+        pending = set(tasks)
+        try:
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Retrieve every error, so that none is reported as never retrieved
+                winner = None
+                for task in done:
+                    if task.exception() is None:
+                        winner = winner or task
+                    else:
+                        error = task.exception()
+                if winner is not None:
+                    return dict(winner.result(), model=tasks[winner])
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def render_payload(
+        self,
+        custom_id: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        system: Optional[str] = None,
+        tools: Optional[List[Dict]] = None,
+        json_schema: Optional[Dict] = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.0,
+        cache_prefix: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Render a completion request as one line of a Batch API input file.
+
+        Arguments are the same as for complete(), the request is not sent.
+
+        Args:
+            custom_id: Identifier used to match the request to its result
+
+        Returns:
+            Batch request dict with custom_id, method, url and body
+        """
+        body = self._build_request(
+            model, messages, system, tools, json_schema, max_tokens, temperature, cache_prefix
+        )
+        body.pop("api_base", None)
+
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": body
+        }
+
+    def submit_batch(self, jsonl_path: str) -> str:
+        """
+        Upload a JSONL file of rendered requests and create a batch.
+
+        Args:
+            jsonl_path: Path to a file of render_payload() lines
+
+        Returns:
+            Batch ID
+        """
+        if self.provider == "ollama":
+            raise ValueError("Batch API is not supported for provider 'ollama'")
+
+        litellm = _litellm()
+        with open(jsonl_path, "rb") as f:
+            batch_file = litellm.create_file(file=f, purpose="batch", custom_llm_provider=self.provider)
+
+        batch = litellm.create_batch(
+            completion_window="24h",
+            endpoint="/v1/chat/completions",
+            input_file_id=batch_file.id,
+            custom_llm_provider=self.provider
+        )
+        return batch.id
+
+    def poll_batch(self, batch_id: str) -> str:
+        """Get the status of a batch (e.g. "in_progress", "completed", "failed")."""
+        batch = _litellm().retrieve_batch(batch_id=batch_id, custom_llm_provider=self.provider)
+        return batch.status
+
+    def fetch_results(self, batch_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Download the results of a completed batch.
+
+        Args:
+            batch_id: Batch ID from submit_batch()
+
+        Returns:
+            Dict mapping custom_id to a standardized response dict (as
+            returned by complete()); failed requests are left out
+        """
+        litellm = _litellm()
+        batch = litellm.retrieve_batch(batch_id=batch_id, custom_llm_provider=self.provider)
+        content = litellm.file_content(file_id=batch.output_file_id, custom_llm_provider=self.provider)
+
+        loads = orjson.loads if orjson is not None else json.loads
+        results = {}
+        for line in content.content.splitlines():
+            if not line.strip():
+                continue
+            item = loads(line)
+            response = item.get("response") or {}
+            if item.get("error") or response.get("status_code") != 200:
+                continue
+            results[item["custom_id"]] = self._parse_response(litellm.ModelResponse(**response["body"]))
+
+        return results
+
+    def _cache_key(self, kwargs: Dict[str, Any]) -> Optional[str]:
+        """Hash the canonical JSON form of a request (None when caching is off)."""
+        if not self.cache_size:
+            return None
+
+        # Requests that differ only in endpoint, case or Unicode form share a key
+        request = {k: v for k, v in kwargs.items() if k not in _CACHE_IGNORED_KWARGS}
+        request["model"] = request["model"].lower()
+        request["messages"] = [_normalize_message(message) for message in request["messages"]]
+        for name in _DIGESTED_KWARGS:
+            if request.get(name) is not None:
+                request[name] = self._digest(request[name])
+
+        return hashlib.sha256(_canonical_json(request)).hexdigest()
+
+    def _digest(self, obj: Any) -> str:
+        """
+        Hash of a tool list or schema, computed once per object.
+
+        Agents pass the same (unmodified) tools and schema objects on every
+        call, so they are encoded only the first time they are seen.
+        """
+        entry = self._digests.get(id(obj))
+        # The stored reference keeps the id from being reused by another object
+        if entry is None or entry[0] is not obj:
+            if len(self._digests) >= 256:
+                self._digests.clear()
+            entry = (obj, hashlib.sha256(_canonical_json(obj)).hexdigest())
+            self._digests[id(obj)] = entry
+        return entry[1]
+
+    def _cache_get(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return a copy of a cached response and mark it recently used."""
+        if key is None:
+            return None
+        if self._response_cache is not None:
+            return self._response_cache.get(key)
+        if key not in self._cache:
+            return None
+        self._cache.move_to_end(key)
+        return copy.deepcopy(self._cache[key])
+
+    def _cache_put(self, key: Optional[str], response: Dict[str, Any], model: str = None) -> None:
+        """Store a response, evicting the least recently used beyond cache_size."""
+        if key is None:
+            return
+        if self._response_cache is not None:
+            self._response_cache.put(key, model, response)
+            return
+        self._cache[key] = copy.deepcopy(response)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _build_request(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        system: Optional[str],
+        tools: Optional[List[Dict]],
+        json_schema: Optional[Dict],
+        max_tokens: int,
+        temperature: float,
+        cache_prefix: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the litellm keyword arguments for a completion request."""
+        # Prepare arguments for litellm
+        kwargs = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        }
+
+        # Add api_base for Ollama
+        if self.provider == "ollama" and self.base_url:
+            kwargs["api_base"] = self.base_url
+
+        # Add system prompt if provided
+        if system or cache_prefix:
+            # For models that support system parameter
+            if self.provider in ["anthropic", "openai", "ollama"]:
+                # Prepend system message to messages list
+                kwargs["messages"] = [{"role": "system", "content": self._system_content(system, cache_prefix)}] + messages
+
+        # Add structured output if requested
+        if json_schema and self._supports_structured_output(model):
+            kwargs["response_format"] = json_schema
+            # Note: Cannot use tools with structured output in most APIs
+            if tools:
+                raise ValueError(
+                    "Cannot use tools with structured output. "
+                    "Structured output is only for final agent response."
+                )
+        # Add tools if provided and model supports them
+        if tools and self._supports_tools(model):
+            kwargs["tools"] = tools
+            kwargs["tool_choice"] = "auto"
+
+        # For Ollama, prefix model name with "ollama/"
+        kwargs["model"] = _litellm_model_name(self.provider, model)
+
+        return kwargs
+
+    def _system_content(self, system: Optional[str], cache_prefix: Optional[str]) -> Any:
+        """
+        System message content, with the shared prefix at the end.
+
+        Anthropic only caches up to an explicit cache_control breakpoint;
+        OpenAI and Ollama reuse any identical leading tokens on their own.
+        """
+        if not cache_prefix:
+            return system
+
+        if self.provider == "anthropic":
+            blocks = [{"type": "text", "text": system}] if system else []
+            blocks.append({"type": "text", "text": cache_prefix, "cache_control": {"type": "ephemeral"}})
+            return blocks
+
+        return f"{system}\n\n{cache_prefix}" if system else cache_prefix
+
     def _parse_response(self, response: Any) -> Dict[str, Any]:
         """
         Parse LiteLLM response into standardized format.
@@ -126,42 +766,30 @@ class LLMClient:
         Returns:
             Standardized dict with content, tool_calls, and usage
         """
-        # Extract content
-        content = ""
-        tool_calls = []
-
-        if hasattr(response, 'choices') and len(response.choices) > 0:
-            choice = response.choices[0]
-            message = choice.message
-
-            # Extract text content
-            if hasattr(message, 'content') and message.content:
-                content = message.content
-
-            # Extract tool calls if present
-            if hasattr(message, 'tool_calls') and message.tool_calls:
-                for tool_call in message.tool_calls:
-                    tool_calls.append({
-                        "id": tool_call.id if hasattr(tool_call, 'id') else None,
-                        "name": tool_call.function.name,
-                        "arguments": tool_call.function.arguments
-                    })
+        try:
+            message = response.choices[0].message
+        except (AttributeError, IndexError):
+            message = None
+
+        # Extract text content and tool calls if present
+        content = getattr(message, "content", None) or ""
+        tool_calls = [
+            {
+                "id": getattr(tool_call, "id", None),
+                "name": tool_call.function.name,
+                "arguments": tool_call.function.arguments
+            }
+            for tool_call in getattr(message, "tool_calls", None) or ()
+        ]
 
         # Extract usage information
+        usage_obj = getattr(response, "usage", None)
         usage = {
-            "input_tokens": 0,
-            "output_tokens": 0,
-            "total_tokens": 0
+            "input_tokens": getattr(usage_obj, "prompt_tokens", 0) or 0,
+            "output_tokens": getattr(usage_obj, "completion_tokens", 0) or 0,
+            "total_tokens": getattr(usage_obj, "total_tokens", 0) or 0
         }
 
-        if hasattr(response, 'usage'):
-            usage_obj = response.usage
-            usage = {
-                "input_tokens": getattr(usage_obj, 'prompt_tokens', 0),
-                "output_tokens": getattr(usage_obj, 'completion_tokens', 0),
-                "total_tokens": getattr(usage_obj, 'total_tokens', 0)
-            }
-
         return {
             "content": content,
             "tool_calls": tool_calls,
@@ -178,6 +806,12 @@ class LLMClient:
         Returns:
             True if model supports tools
         """
+        if model not in self._tool_support:
+            self._tool_support[model] = self._probe_tool_support(model)
+        return self._tool_support[model]
+
+    def _probe_tool_support(self, model: str) -> bool:
+        """Determine tool support for a model (may query the Ollama daemon)."""
         # Claude models support tools
         if "claude" in model.lower():
             return True
@@ -188,8 +822,7 @@ class LLMClient:
 
         # Some Ollama models support tools
         if "ollama" in self.provider.lower():
-            model_info = ollama.show(model)
-            if "tools" in model_info.capabilities:
+            if "tools" in _ollama_capabilities(self.base_url, model):
                 return True
 
         # Default to False for unknown models
@@ -205,13 +838,4 @@ class LLMClient:
         Returns:
             True if model supports structured output
         """
-
-        if "ollama" in self.provider.lower():
-            # Assume all Ollama models support structured output
-            return True
-        else:
-            params = get_supported_openai_params(model, custom_llm_provider=self.provider)
-            if "response_format" in params:
-                return supports_response_schema(model, custom_llm_provider=self.provider)
-
-        return False
+        return _structured_output_support(self.provider, model)
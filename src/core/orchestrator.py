@@ -2,9 +2,199 @@
 Workflow orchestration for single-agent and multi-agent patterns.
 """
 
+import asyncio
+import contextlib
+import json
+import re
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
-from datetime import datetime
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Deque, Callable
+from datetime import datetime, timezone
+
+from .batch import BatchProcessor
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, fall back to the stdlib encoder
+    orjson = None
+
+__all__ = [
+    "ExecutionStep",
+    "Workflow",
+    "SingleAgentWorkflow",
+    "SequentialWorkflow",
+    "HierarchicalWorkflow",
+]
+
+
+def _log_preview(value: Any, limit: int = 512) -> Optional[str]:
+    """Truncated repr of a logged value."""
+    if value is None:
+        return None
+    return repr(value)[:limit]
+
+
+@dataclass(slots=True)
+class ExecutionStep:
+    """One entry of a workflow's execution log."""
+    timestamp_ns: int
+    step: str
+    agent: str
+    input: Any
+    output: Any
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Exported form, with an ISO 8601 (UTC) timestamp."""
+        return {
+            "timestamp": datetime.fromtimestamp(self.timestamp_ns / 1e9, tz=timezone.utc).isoformat(),
+            "step": self.step,
+            "agent": self.agent,
+            "input": self.input,
+            "output": self.output
+        }
+
+
+# Supervisor prompts; only the fields change between runs
+_PLANNING_TEMPLATE = """Task: {task}
+
+You are the supervisor. Analyze this task and create an execution plan.
+
+Available specialist agents: {specialists}
+
+Specialist capabilities:
+{capabilities}
+
+Create a plan by deciding:
+1. Which specialists should work on this task?
+2. What specific subtask should each specialist handle?
+3. In what order should they execute?{order_note}
+
+Respond in this format:
+PLAN:
+- Agent: <specialist_name>
+  Subtask: <specific subtask for this agent>
+- Agent: <specialist_name>
+  Subtask: <specific subtask for this agent>
+
+Then wait for their results before synthesizing."""
+
+_SYNTHESIS_HEADER_TEMPLATE = """Original task: {task}
+
+Your plan was:
+{plan_text}
+
+Specialist results:
+"""
+
+_SYNTHESIS_INSTRUCTION = "\nNow synthesize these results into a final, coherent answer to the original task."
+
+
+# Default size budget of the agent history returned by SequentialWorkflow
+_DEFAULT_MAX_HISTORY_CHARS = 100_000
+
+# One "Agent: <name> / Subtask: <text>" entry of a supervisor plan
+_PLAN_BLOCK_RE = re.compile(r"Agent:\s*(\w+)\s*\n\s*Subtask:\s*(.+?)(?=\n\s*-?\s*Agent:|\Z)", re.DOTALL)
+
+
+class _PlanStream:
+    """Collects a streamed supervisor plan and reports each entry once it is complete."""
+
+    def __init__(self, on_entry: Callable[[str, str], None]):
+        self.on_entry = on_entry
+        self.text = ""
+        self._pos = 0
+
+    def feed(self, delta: str):
+        """Add generated text; an entry is complete once the next one begins."""
+        self.text += delta
+        self._scan(final=False)
+
+    def reset(self):
+        """
+        Discard the text so far, which belonged to a turn that called tools.
+
+        Entries already reported from that text are not taken back.
+        """
+        self.text = ""
+        self._pos = 0
+
+    def close(self):
+        """Report the entries left at the end of the plan."""
+        self._scan(final=True)
+
+    def _scan(self, final: bool):
+        for match in _PLAN_BLOCK_RE.finditer(self.text, self._pos):
+            if not final and match.end() == len(self.text):
+                break
+            self.on_entry(match.group(1), match.group(2).strip())
+            self._pos = match.end()
+
+
+async def _gather_or_cancel(tasks: List[asyncio.Task]) -> List[Any]:
+    """Await tasks together; if one fails (or the caller is cancelled), cancel the rest."""
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for running in tasks:
+            running.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def _json_size(value: Any) -> int:
+    """Length of a value's JSON encoding."""
+    if orjson is not None:
+        return len(orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS, default=str))
+    return len(json.dumps(value, separators=(",", ":"), default=str))
+
+
+class _RollingHistory:
+    """
+    Agent history of a workflow run, optionally bounded in size.
+
+    Beyond max_chars (of JSON), the oldest entries are dropped and
+    replaced by a single summary entry counting what was left out.
+    """
+
+    def __init__(self, max_chars: Optional[int] = None):
+        self.max_chars = max_chars
+        self.entries: Deque[Dict] = deque()
+        self._sizes: Deque[int] = deque()
+        self._chars = 0
+        self._dropped = 0
+        self._dropped_chars = 0
+
+    def extend(self, entries: List[Dict]):
+        """Add history entries, dropping the oldest ones over budget."""
+        if self.max_chars is None:
+            self.entries.extend(entries)
+            return
+
+        for entry in entries:
+            size = _json_size(entry)
+            self.entries.append(entry)
+            self._sizes.append(size)
+            self._chars += size
+
+        # Always keep the newest entry
+        while self._chars > self.max_chars and len(self.entries) > 1:
+            self.entries.popleft()
+            size = self._sizes.popleft()
+            self._chars -= size
+            self._dropped += 1
+            self._dropped_chars += size
+
+    def export(self) -> List[Dict]:
+        """History entries, preceded by a summary of dropped ones if any."""
+        if not self._dropped:
+            return list(self.entries)
+        summary = {
+            "role": "summary",
+            "content": f"{self._dropped} earlier history entries ({self._dropped_chars} chars) omitted"
+        }
+        return [summary, *self.entries]
 
 
 class Workflow(ABC):
@@ -20,7 +210,13 @@ class Workflow(ABC):
         """
         self.agents = agents
         self.config = config
-        self.execution_log: List[Dict] = []
+
+        # Bounded so long-running workflows cannot grow the log without limit
+        self.execution_log: Deque[ExecutionStep] = deque(maxlen=config.get("max_log_steps", 10000))
+
+        # With a limit, step inputs/outputs are logged as truncated reprs
+        # instead of holding on to the full prompts and results
+        self.log_preview_chars: Optional[int] = config.get("log_preview_chars")
 
     @abstractmethod
     def execute(self, task: str, data: Dict) -> Dict[str, Any]:
@@ -39,15 +235,38 @@ class Workflow(ABC):
         """
         pass
 
+    async def aexecute(self, task: str, data: Dict) -> Dict[str, Any]:
+        """
+        Execute workflow from async code.
+
+        Workflows without native async support run execute() in a worker
+        thread so they don't block the event loop.
+        """
+        return await asyncio.to_thread(self.execute, task, data)
+
+    def _run_aexecute(self, task: str, data: Dict) -> Dict[str, Any]:
+        """Run aexecute() to completion for execute() of natively async workflows."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aexecute(task, data))
+        # asyncio.run() cannot nest, e.g. in Jupyter or async applications
+        raise RuntimeError(
+            f"{type(self).__name__}.execute() cannot be called from a running event loop; "
+            f"use 'await workflow.aexecute(task, data)' instead"
+        )
+
     def _log_step(self, step_name: str, agent_name: str, input_data: Any, output_data: Any):
         """Log a workflow step."""
-        self.execution_log.append({
-            "timestamp": datetime.now().isoformat(),
-            "step": step_name,
-            "agent": agent_name,
-            "input": input_data,
-            "output": output_data
-        })
+        if self.log_preview_chars is not None:
+            input_data = _log_preview(input_data, self.log_preview_chars)
+            output_data = _log_preview(output_data, self.log_preview_chars)
+
+        self.execution_log.append(ExecutionStep(time.time_ns(), step_name, agent_name, input_data, output_data))
+
+    def _export_log(self) -> List[Dict]:
+        """Execution log as a list of dicts, with ISO 8601 (UTC) timestamps."""
+        return [step.as_dict() for step in self.execution_log]
 
 
 class SingleAgentWorkflow(Workflow):
@@ -91,14 +310,26 @@ class SingleAgentWorkflow(Workflow):
 
         return {
             "result": result["content"],
-            "execution_log": self.execution_log,
+            "execution_log": self._export_log(),
             "agent_history": result["history"],
             "usage": total_usage
         }
 
 
 class SequentialWorkflow(Workflow):
-    """Agents execute in sequence, each receiving prior results as context."""
+    """
+    Agents execute in sequence, each receiving prior results as context.
+
+    Optionally, ``parallel_groups`` in the workflow config splits
+    agent_sequence into consecutive groups. Agents within a group are
+    independent of each other and run concurrently; the next group receives
+    the combined output of the previous one. With ``batch.enabled``, a
+    group runs through a BatchProcessor, which can submit the agents' first
+    LLM turn as one provider batch (``batch.use_batch_api``).
+
+    Only the newest agent history entries that fit in ``max_history_chars``
+    characters of JSON (default 100,000; null = unbounded) are returned.
+    """
 
     def execute(self, task: str, data: Dict) -> Dict[str, Any]:
         """
@@ -111,6 +342,10 @@ class SequentialWorkflow(Workflow):
         Returns:
             Result dict with final agent response
         """
+        return self._run_aexecute(task, data)
+
+    async def aexecute(self, task: str, data: Dict) -> Dict[str, Any]:
+        """Execute sequential multi-agent workflow (see execute())."""
         agent_sequence = self.config.get("agent_sequence", [])
 
         if not agent_sequence:
@@ -121,6 +356,8 @@ class SequentialWorkflow(Workflow):
             if agent_name not in self.agents:
                 raise ValueError(f"Agent '{agent_name}' not found")
 
+        groups = self.config.get("parallel_groups") or [[name] for name in agent_sequence]
+
         # Track context across agents
         context = {
             "log_source": data.get("log_source"),
@@ -128,44 +365,98 @@ class SequentialWorkflow(Workflow):
             "available_data": list(data.keys())
         }
 
-        total_usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
-        all_agent_histories = []
+        total_usage = Counter(input_tokens=0, output_tokens=0, total_tokens=0)
+        # Bounded with max_history_chars, for long agent chains
+        all_agent_histories = _RollingHistory(self.config.get("max_history_chars", _DEFAULT_MAX_HISTORY_CHARS))
 
-        # Execute agents in sequence
+        # Execute agent groups in sequence
         final_result = None
 
-        for i, agent_name in enumerate(agent_sequence):
-            agent = self.agents[agent_name]
+        # Position in agent_sequence of each group's first agent (names may repeat)
+        position = 0
 
-            # First agent gets original task, others get results from previous
-            if i == 0:
+        for group_index, group in enumerate(groups):
+            # First group gets original task, others get results from previous
+            if group_index == 0:
                 agent_task = task
             else:
                 agent_task = f"Previous agent output: {final_result}\n\nOriginal task: {task}"
 
-            self._log_step(f"agent_{i+1}_start", agent_name, {"task": agent_task, "context": context}, None)
+            results = await self._run_group(position, group, agent_task, context)
+            position += len(group)
 
-            result = agent.run(agent_task, context=context)
+            for agent_name, result in zip(group, results):
+                # Update context with this agent's results
+                context[f"{agent_name}_output"] = result["content"]
 
-            self._log_step(f"agent_{i+1}_complete", agent_name, None, result)
+                # Track usage and history
+                total_usage.update(result["usage"])
+                all_agent_histories.extend(result["history"])
 
-            # Update context with this agent's results
-            context[f"{agent_name}_output"] = result["content"]
-            final_result = result["content"]
-
-            # Track usage and history
-            total_usage["input_tokens"] += result["usage"]["input_tokens"]
-            total_usage["output_tokens"] += result["usage"]["output_tokens"]
-            total_usage["total_tokens"] += result["usage"]["total_tokens"]
-            all_agent_histories.extend(result["history"])
+            if len(group) == 1:
+                final_result = results[0]["content"]
+            else:
+                final_result = "\n\n".join(
+                    f"{agent_name}: {result['content']}" for agent_name, result in zip(group, results)
+                )
 
         return {
             "result": final_result,
-            "execution_log": self.execution_log,
-            "agent_history": all_agent_histories,
-            "usage": total_usage
+            "execution_log": self._export_log(),
+            "agent_history": all_agent_histories.export(),
+            "usage": dict(total_usage)
         }
 
+    async def _run_group(self, start: int, group: List[str], agent_task: str, context: Dict) -> List[Dict[str, Any]]:
+        """
+        Run a group of independent agents concurrently, or as a batch when configured.
+
+        Args:
+            start: Position of the group's first agent in agent_sequence
+            group: Names of the agents in the group
+            agent_task: Task given to every agent of the group
+            context: Shared context
+
+        Returns:
+            Agent results, in the order of group
+        """
+        batch_config = self.config.get("batch") or {}
+
+        if not batch_config.get("enabled") or len(group) == 1:
+            return await _gather_or_cancel([
+                asyncio.ensure_future(self._run_agent(i, agent_name, agent_task, context))
+                for i, agent_name in enumerate(group, start)
+            ])
+
+        processor = BatchProcessor(
+            self.agents[group[0]].client,
+            max_concurrency=batch_config.get("max_concurrency"),
+            rate_limit_per_min=batch_config.get("rate_limit"),
+            use_batch_api=batch_config.get("use_batch_api", False)
+        )
+
+        for i, agent_name in enumerate(group, start):
+            self._log_step(f"agent_{i+1}_start", agent_name, {"task": agent_task, "context": context}, None)
+
+        results = await processor.run([(self.agents[agent_name], agent_task, context) for agent_name in group])
+
+        for i, (agent_name, result) in enumerate(zip(group, results), start):
+            self._log_step(f"agent_{i+1}_complete", agent_name, None, result)
+
+        return results
+
+    async def _run_agent(self, i: int, agent_name: str, agent_task: str, context: Dict) -> Dict[str, Any]:
+        """Run one agent of the sequence and log its start and completion."""
+        agent = self.agents[agent_name]
+
+        self._log_step(f"agent_{i+1}_start", agent_name, {"task": agent_task, "context": context}, None)
+
+        result = await agent.arun(agent_task, context=context)
+
+        self._log_step(f"agent_{i+1}_complete", agent_name, None, result)
+
+        return result
+
 
 class HierarchicalWorkflow(Workflow):
     """
@@ -176,9 +467,28 @@ class HierarchicalWorkflow(Workflow):
     3. Delegates subtasks to specialist agents
     4. Synthesizes results from specialists into final answer
 
-    # TODO: Currently, specialists are executed sequentially. Future: actually follow plan from supervisor.
+    With ``parallel_specialists`` in the workflow config, specialists run
+    concurrently (at most ``max_parallel_specialists`` at a time) and do not
+    see each other's results; otherwise they run in sequence.
+
+    With ``prompt_prefix_cache``, the original task and the supervisor's plan
+    are sent to each specialist as a prompt-cached prefix of its system prompt
+    instead of as part of its task, so the prefill is reused on every further
+    LLM call of that specialist's run.
+
+    With ``stream_plan``, the supervisor's plan is streamed and each specialist
+    starts as soon as its "Agent: / Subtask:" entry is complete, working on
+    that subtask alone. Specialists the plan does not mention start with the
+    full plan once it is done. Specialists then always run in parallel.
+
+    # TODO: Future: actually follow plan from supervisor.
     """
 
+    def __init__(self, agents: Dict[str, Any], config: Dict):
+        super().__init__(agents, config)
+        # Capability descriptions keyed by specialist names and agent identities
+        self._capabilities_cache: Dict[tuple, str] = {}
+
     def execute(self, task: str, data: Dict) -> Dict[str, Any]:
         """
         Execute hierarchical workflow with supervisor coordination.
@@ -190,6 +500,10 @@ class HierarchicalWorkflow(Workflow):
         Returns:
             Result dict with final synthesized response
         """
+        return self._run_aexecute(task, data)
+
+    async def aexecute(self, task: str, data: Dict) -> Dict[str, Any]:
+        """Execute hierarchical workflow with supervisor coordination (see execute())."""
         # Get supervisor agent (first in sequence)
         agent_sequence = self.config.get("agent_sequence", [])
 
@@ -213,44 +527,52 @@ class HierarchicalWorkflow(Workflow):
             "specialist_capabilities": self._get_specialist_capabilities(specialist_names)
         }
 
-        total_usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+        total_usage = Counter(input_tokens=0, output_tokens=0, total_tokens=0)
         all_agent_histories = []
 
-        # Step 1: Supervisor creates execution plan
-        planning_task = f"""Task: {task}
-
-You are the supervisor. Analyze this task and create an execution plan.
-
-Available specialist agents: {', '.join(specialist_names)}
-
-Specialist capabilities:
-{context['specialist_capabilities']}
-
-Create a plan by deciding:
-1. Which specialists should work on this task?
-2. What specific subtask should each specialist handle?
-3. In what order should they execute? (note: parallel execution not yet implemented, use sequential)
-
-Respond in this format:
-PLAN:
-- Agent: <specialist_name>
-  Subtask: <specific subtask for this agent>
-- Agent: <specialist_name>
-  Subtask: <specific subtask for this agent>
+        # Specialists only see each other's results when run sequentially
+        stream_plan = self.config.get("stream_plan", False)
+        parallel = self.config.get("parallel_specialists", False) or stream_plan
 
-Then wait for their results before synthesizing."""
+        # Step 1: Supervisor creates execution plan
+        planning_task = _PLANNING_TEMPLATE.format(
+            task=task,
+            specialists=', '.join(specialist_names),
+            capabilities=context['specialist_capabilities'],
+            order_note='' if parallel else ' (note: parallel execution not yet implemented, use sequential)'
+        )
 
         self._log_step("supervisor_planning", supervisor_name, {"task": planning_task, "context": context}, None)
 
-        planning_result = supervisor.run(planning_task, context=context)
-        breakpoint()
+        semaphore = asyncio.Semaphore(self.config.get("max_parallel_specialists", 8)) if parallel else None
+        started: Dict[str, asyncio.Task] = {}
+
+        if stream_plan:
+            def start_specialist(name: str, subtask: str):
+                if name in specialist_names and name in self.agents and name not in started:
+                    started[name] = asyncio.create_task(self._run_specialist(
+                        semaphore, name, self._streamed_specialist_task(task, name, subtask), context
+                    ))
+
+            plan_stream = _PlanStream(start_specialist)
+            try:
+                # Only the supervisor's final turn holds the plan
+                planning_result = await supervisor.arun(
+                    planning_task, context=context, on_text=plan_stream.feed, on_tool_turn=plan_stream.reset
+                )
+                plan_stream.close()
+            except BaseException:
+                for run in started.values():
+                    run.cancel()
+                await asyncio.gather(*started.values(), return_exceptions=True)
+                raise
+        else:
+            planning_result = await supervisor.arun(planning_task, context=context)
 
         self._log_step("supervisor_plan_complete", supervisor_name, None, planning_result)
 
         # Track usage
-        total_usage["input_tokens"] += planning_result["usage"]["input_tokens"]
-        total_usage["output_tokens"] += planning_result["usage"]["output_tokens"]
-        total_usage["total_tokens"] += planning_result["usage"]["total_tokens"]
+        total_usage.update(planning_result["usage"])
         all_agent_histories.extend(planning_result["history"])
 
         # Step 2: Execute specialists based on plan
@@ -259,78 +581,118 @@ Then wait for their results before synthesizing."""
         specialist_results = {}
 
         # Execute each specialist mentioned in agent_sequence
-        # For now, we execute all specialists sequentially
         # TODO: parse plan to be more dynamic
-        for specialist_name in specialist_names:
-            if specialist_name not in self.agents:
-                continue
-
-            specialist = self.agents[specialist_name]
-
-            # Build subtask for specialist
-            # Include original task + supervisor's plan + previous specialist results
-            specialist_task = f"""Original task: {task}
-
-Supervisor's plan:
-{plan_text}
-
-"""
-            if specialist_results:
-                specialist_task += "Previous specialist results:\n"
-                for prev_name, prev_result in specialist_results.items():
-                    specialist_task += f"\n{prev_name}: {prev_result}\n"
-
-            specialist_task += f"\nYour role: Execute your part of the plan as the {specialist_name} specialist."
-
-            self._log_step(f"specialist_{specialist_name}_start", specialist_name, {"task": specialist_task}, None)
-
-            result = specialist.run(specialist_task, context=context)
-
-            self._log_step(f"specialist_{specialist_name}_complete", specialist_name, None, result)
-
-            # Store result
-            specialist_results[specialist_name] = result["content"]
-
+        specialist_names = [name for name in specialist_names if name in self.agents]
+
+        # Shared by every specialist, either as a cached prompt prefix or inline
+        cache_prefix = None
+        if self.config.get("prompt_prefix_cache", False):
+            cache_prefix = self._specialist_prefix(task, plan_text)
+
+        if parallel:
+            # Start every specialist first (unless started while streaming the plan), then await them together
+            for name in specialist_names:
+                if name not in started:
+                    started[name] = asyncio.create_task(self._run_specialist(
+                        semaphore, name, self._specialist_task(task, plan_text, name, {}, cache_prefix is None),
+                        context, cache_prefix
+                    ))
+            results = await _gather_or_cancel([started[name] for name in specialist_names])
+            specialist_results = {name: result["content"] for name, result in zip(specialist_names, results)}
+        else:
+            results = []
+            for specialist_name in specialist_names:
+                specialist_task = self._specialist_task(
+                    task, plan_text, specialist_name, specialist_results, cache_prefix is None
+                )
+                result = await self._run_specialist(None, specialist_name, specialist_task, context, cache_prefix)
+                specialist_results[specialist_name] = result["content"]
+                results.append(result)
+
+        for result in results:
             # Track usage
-            total_usage["input_tokens"] += result["usage"]["input_tokens"]
-            total_usage["output_tokens"] += result["usage"]["output_tokens"]
-            total_usage["total_tokens"] += result["usage"]["total_tokens"]
+            total_usage.update(result["usage"])
             all_agent_histories.extend(result["history"])
 
         # Step 3: Supervisor synthesizes final answer
-        synthesis_task = f"""Original task: {task}
-
-Your plan was:
-{plan_text}
-
-Specialist results:
-"""
-        for specialist_name, result in specialist_results.items():
-            synthesis_task += f"\n{specialist_name}:\n{result}\n"
-
-        synthesis_task += "\nNow synthesize these results into a final, coherent answer to the original task."
+        parts = [_SYNTHESIS_HEADER_TEMPLATE.format(task=task, plan_text=plan_text)]
+        parts.extend(f"\n{specialist_name}:\n{result}\n" for specialist_name, result in specialist_results.items())
+        parts.append(_SYNTHESIS_INSTRUCTION)
+        synthesis_task = "".join(parts)
 
         self._log_step("supervisor_synthesis_start", supervisor_name, {"task": synthesis_task}, None)
 
-        final_result = supervisor.run(synthesis_task, context=context)
+        final_result = await supervisor.arun(synthesis_task, context=context)
 
         self._log_step("supervisor_synthesis_complete", supervisor_name, None, final_result)
 
         # Track final usage
-        total_usage["input_tokens"] += final_result["usage"]["input_tokens"]
-        total_usage["output_tokens"] += final_result["usage"]["output_tokens"]
-        total_usage["total_tokens"] += final_result["usage"]["total_tokens"]
+        total_usage.update(final_result["usage"])
         all_agent_histories.extend(final_result["history"])
 
         return {
             "result": final_result["content"],
-            "execution_log": self.execution_log,
+            "execution_log": self._export_log(),
             "agent_history": all_agent_histories,
-            "usage": total_usage
+            "usage": dict(total_usage)
         }
 
+    def _specialist_prefix(self, task: str, plan_text: str) -> str:
+        """Part of the specialist subtask that is the same for every specialist."""
+        return f"Original task: {task}\n\nSupervisor's plan:\n{plan_text}"
+
+    def _specialist_task(
+        self,
+        task: str,
+        plan_text: str,
+        specialist_name: str,
+        specialist_results: Dict[str, str],
+        include_prefix: bool = True
+    ) -> str:
+        """Build a specialist's subtask: original task, supervisor's plan and previous specialist results."""
+        parts = [f"{self._specialist_prefix(task, plan_text)}\n\n"] if include_prefix else []
+        if specialist_results:
+            parts.append("Previous specialist results:\n")
+            parts.extend(f"\n{prev_name}: {prev_result}\n" for prev_name, prev_result in specialist_results.items())
+
+        parts.append(f"\nYour role: Execute your part of the plan as the {specialist_name} specialist.")
+        return "".join(parts).lstrip()
+
+    def _streamed_specialist_task(self, task: str, specialist_name: str, subtask: str) -> str:
+        """Build a specialist's subtask from its entry in a plan that is still being written."""
+        return (
+            f"Original task: {task}\n\n"
+            f"Your subtask from the supervisor:\n{subtask}\n\n"
+            f"Your role: Execute your part of the plan as the {specialist_name} specialist."
+        )
+
+    async def _run_specialist(
+        self,
+        semaphore,
+        specialist_name: str,
+        specialist_task: str,
+        context: Dict,
+        cache_prefix: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Run one specialist and log its start and completion."""
+        async with semaphore or contextlib.nullcontext():
+            self._log_step(f"specialist_{specialist_name}_start", specialist_name, {"task": specialist_task}, None)
+
+            if cache_prefix:
+                result = await self.agents[specialist_name].arun(specialist_task, context=context, cache_prefix=cache_prefix)
+            else:
+                result = await self.agents[specialist_name].arun(specialist_task, context=context)
+
+            self._log_step(f"specialist_{specialist_name}_complete", specialist_name, None, result)
+        return result
+
     def _get_specialist_capabilities(self, specialist_names: List[str]) -> str:
         """Get description of specialist capabilities from their system prompts."""
+        key = (tuple(specialist_names), tuple(id(self.agents.get(name)) for name in specialist_names))
+        cached = self._capabilities_cache.get(key)
+        if cached is not None:
+            return cached
+
         capabilities = []
         for name in specialist_names:
             if name in self.agents:
@@ -339,4 +701,6 @@ Specialist results:
                 prompt_lines = agent.config.system_prompt.strip().split('\n')
                 capability = " ".join(prompt_lines[:2]) if prompt_lines else f"{name} specialist"
                 capabilities.append(f"- {name}: {capability}")
-        return '\n'.join(capabilities)
+
+        self._capabilities_cache[key] = '\n'.join(capabilities)
+        return self._capabilities_cache[key]
@@ -0,0 +1,95 @@
+"""
+Persistent LLM response cache backed by SQLite.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Any
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, fall back to the stdlib encoder
+    orjson = None
+
+
+def _dumps(obj: Any) -> bytes:
+    """Encode a response as JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+# Both accept bytes and str
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+class ResponseCache:
+    """
+    SQLite store of parsed LLM responses keyed by request hash.
+
+    Entries survive across runs; the least recently used ones are evicted
+    beyond max_entries.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 10000):
+        """
+        Initialize cache.
+
+        Args:
+            db_path: Path to SQLite database file
+            max_entries: Maximum number of cached responses
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        # Shared between the sync and async (worker thread) completion paths
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                created REAL,
+                last_used REAL,
+                payload BLOB
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+        self.conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response for a key and mark it recently used."""
+        with self._lock:
+            row = self.conn.execute("SELECT payload FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+        return _loads(row[0])
+
+    def put(self, key: str, model: str, response: Dict[str, Any]) -> None:
+        """Store a response, evicting the least recently used beyond max_entries."""
+        payload = _dumps(response)
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, created, last_used, payload) VALUES (?, ?, ?, ?, ?)",
+                (key, model, now, now, payload)
+            )
+            self.conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self.conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        """Close database connection."""
+        self.conn.close()
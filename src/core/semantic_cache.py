@@ -0,0 +1,190 @@
+"""
+Semantic (embedding-similarity) response cache in front of an LLMClient.
+"""
+
+import copy
+import functools
+import hashlib
+import json
+import logging
+import math
+import sqlite3
+import threading
+from typing import List, Dict, Optional, Any, Tuple
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, fall back to the stdlib encoder
+    orjson = None
+
+
+def _dumps(obj: Any) -> str:
+    """Encode a vector or response as JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+logger = logging.getLogger(__name__)
+
+
+@functools.cache
+def _litellm():
+    """LiteLLM, imported on first use (it takes seconds to import)."""
+    import litellm
+    return litellm
+
+
+class SemanticCache:
+    """
+    Return cached responses for prompts that are similar, not only identical.
+
+    Wraps an LLMClient and exposes the same complete()/acomplete() interface.
+    The last message of a request is embedded and compared by cosine
+    similarity with earlier requests in the same namespace. The namespace
+    is a hash of everything else in the request (model, system prompt,
+    tools, schema, generation settings and earlier messages), so a hit
+    only substitutes a reworded final prompt.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        embedding_model: str,
+        threshold: float = 0.90,
+        db_path: Optional[str] = None,
+        question_marker: Optional[str] = None
+    ):
+        """
+        Initialize semantic cache.
+
+        Args:
+            client: LLMClient to forward misses to
+            embedding_model: LiteLLM embedding model (e.g. "ollama/nomic-embed-text")
+            threshold: Minimum cosine similarity for a hit
+            db_path: SQLite file to persist entries in (None = in-memory only)
+            question_marker: If set, only the text after the last occurrence
+                             of this marker (e.g. "Task:") is embedded
+        """
+        self.client = client
+        self.embedding_model = embedding_model
+        self.threshold = threshold
+        self.question_marker = question_marker
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        # namespace -> [(unit vector, response)]
+        self._entries: Dict[str, List[Tuple[List[float], Dict[str, Any]]]] = {}
+
+        self.conn = None
+        if db_path:
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS semantic_cache (
+                    namespace TEXT,
+                    vector TEXT,
+                    payload TEXT
+                )
+            """)
+            self.conn.commit()
+            for namespace, vector, payload in self.conn.execute("SELECT namespace, vector, payload FROM semantic_cache"):
+                self._entries.setdefault(namespace, []).append((_loads(vector), _loads(payload)))
+
+    def __getattr__(self, name):
+        # Everything else (provider, aconnect, batch methods, ...) is the client's
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def complete(self, **kwargs) -> Dict[str, Any]:
+        """Cached counterpart of LLMClient.complete()."""
+        if kwargs.get("bypass_cache"):
+            return self.client.complete(**kwargs)
+
+        namespace, text = self._split_request(kwargs)
+        try:
+            embedding = _litellm().embedding(model=self.embedding_model, input=[text])
+        except Exception as e:
+            # The cache is an optimization, an embedding failure must not fail the completion
+            logger.warning(f"Semantic cache embedding failed, completing uncached: {e}")
+            return self.client.complete(**kwargs)
+        vector = self._normalize(embedding.data[0]["embedding"])
+
+        cached = self._lookup(namespace, vector)
+        if cached is not None:
+            return cached
+
+        response = self.client.complete(**kwargs)
+        self._store(namespace, vector, response)
+        return response
+
+    async def acomplete(self, **kwargs) -> Dict[str, Any]:
+        """Cached counterpart of LLMClient.acomplete()."""
+        if kwargs.get("bypass_cache"):
+            return await self.client.acomplete(**kwargs)
+
+        namespace, text = self._split_request(kwargs)
+        try:
+            embedding = await _litellm().aembedding(model=self.embedding_model, input=[text])
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed, completing uncached: {e}")
+            return await self.client.acomplete(**kwargs)
+        vector = self._normalize(embedding.data[0]["embedding"])
+
+        cached = self._lookup(namespace, vector)
+        if cached is not None:
+            if kwargs.get("on_text") and cached["content"]:
+                kwargs["on_text"](cached["content"])
+            return cached
+
+        response = await self.client.acomplete(**kwargs)
+        self._store(namespace, vector, response)
+        return response
+
+    def _split_request(self, kwargs: Dict[str, Any]) -> Tuple[str, str]:
+        """Split a request into its namespace hash and the text to embed."""
+        messages = kwargs["messages"]
+        text = str(messages[-1].get("content") or "")
+        if self.question_marker and self.question_marker in text:
+            text = text.rsplit(self.question_marker, 1)[1]
+
+        context = {k: v for k, v in kwargs.items() if k not in ("messages", "bypass_cache", "on_text")}
+        context["history"] = messages[:-1]
+        blob = json.dumps(context, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(blob).hexdigest(), text.strip()
+
+    def _lookup(self, namespace: str, vector: List[float]) -> Optional[Dict[str, Any]]:
+        """Most similar cached response above the threshold, if any."""
+        best_score, best_response = -1.0, None
+        with self._lock:
+            for cached_vector, response in self._entries.get(namespace, ()):
+                score = sum(a * b for a, b in zip(vector, cached_vector))
+                if score > best_score:
+                    best_score, best_response = score, response
+
+            if best_response is not None and best_score >= self.threshold:
+                self.hits += 1
+                return copy.deepcopy(best_response)
+            self.misses += 1
+        return None
+
+    def _store(self, namespace: str, vector: List[float], response: Dict[str, Any]) -> None:
+        # A copy, so callers modifying the returned response don't change the cache
+        response = copy.deepcopy(response)
+        with self._lock:
+            self._entries.setdefault(namespace, []).append((vector, response))
+            if self.conn is not None:
+                self.conn.execute(
+                    "INSERT INTO semantic_cache (namespace, vector, payload) VALUES (?, ?, ?)",
+                    (namespace, _dumps(vector), _dumps(response))
+                )
+                self.conn.commit()
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> List[float]:
+        """Scale to unit length so the dot product is the cosine similarity."""
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
@@ -1,14 +1,28 @@
 """Data layer for log parsing and search."""
 
-from .log_parser import LogParser, LogEntry
-from .log_indexer import LogIndexer
-from .log_search import initialize_search, search_logs, get_log_context
-
-__all__ = [
-    "LogParser",
-    "LogEntry",
-    "LogIndexer",
-    "initialize_search",
-    "search_logs",
-    "get_log_context"
-]
\ No newline at end of file
+import importlib
+
+# Exported name -> submodule defining it, imported on first access (PEP 562)
+_EXPORTS = {
+    "LogParser": "log_parser",
+    "LogEntry": "log_parser",
+    "LogIndexer": "log_indexer",
+    "initialize_search": "log_search",
+    "search_logs": "log_search",
+    "get_log_context": "log_search",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -3,13 +3,49 @@ SQLite FTS5-based log indexer for fast keyword search.
 Simple, scalable, and requires no external dependencies.
 """
 
+import copy
+import functools
 import sqlite3
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import json
 
 from .log_parser import LogParser, LogEntry
 
+try:
+    import orjson
+except ImportError:  # Optional dependency, fall back to the stdlib decoder
+    orjson = None
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+# Columns of the logs table, in the order returned by search()
+_LOG_FIELDS = ("id", "source_file", "line_number", "raw_text", "timestamp", "level", "component", "message", "metadata")
+
+_INSERT_LOG_SQL = """
+    INSERT INTO logs (source_file, line_number, raw_text, timestamp,
+                      level, component, message, metadata)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+@functools.lru_cache(maxsize=1024)
+def _metadata_json_cached(items: tuple) -> str:
+    return json.dumps({key: value for key, _, value in items})
+
+
+def _metadata_json(metadata: Dict[str, Any]) -> Optional[str]:
+    """JSON for an entry's metadata; recurring small dicts (e.g. {"pid": ...}) are encoded once."""
+    if not metadata:
+        return None
+    try:
+        # Keyed on value types too: True, 1 and 1.0 are equal but encode differently
+        return _metadata_json_cached(tuple((key, type(value), value) for key, value in metadata.items()))
+    except TypeError:  # Unhashable (nested) values
+        return json.dumps(metadata)
+
 
 class LogIndexer:
     """
@@ -19,17 +55,34 @@ class LogIndexer:
     Stores both structured metadata and raw text for retrieval.
     """
     
-    def __init__(self, db_path: str = ":memory:"):
+    def __init__(self, db_path: str = ":memory:", query_cache_size: int = 256):
         """
         Initialize indexer.
         
         Args:
             db_path: Path to SQLite database file (":memory:" for in-memory)
+            query_cache_size: Number of search results to keep in an LRU
+                              cache, cleared when files are indexed (0 = off)
         """
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        self.query_cache_size = query_cache_size
+        self._query_cache: "OrderedDict[tuple, List[Dict[str, Any]]]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        # The index may be built in a worker thread and queried from another
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row  # Return rows as dicts
+        self._configure_connection()
         self._create_tables()
+
+    def _configure_connection(self):
+        """Tune SQLite for bulk ingestion followed by read-mostly queries."""
+        cursor = self.conn.cursor()
+        # Only takes effect before the first table is created
+        cursor.execute("PRAGMA page_size=8192")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-262144")  # 256 MiB page cache
     
     def _create_tables(self):
         """Create database tables."""
@@ -50,25 +103,43 @@ class LogIndexer:
             )
         """)
         
+        # Level filters (optionally with component) use this index
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_level_component ON logs(level, component)")
+        
+        # Context windows are line ranges within one source
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_source_line ON logs(source_file, line_number)")
+        
         # FTS5 virtual table for full-text search
-        # Search on raw_text and message fields
+        # Search on raw_text and message fields; prefix indexes make
+        # prefix queries such as "nova*" index lookups
         cursor.execute("""
             CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5(
                 raw_text,
                 message,
                 content='logs',
-                content_rowid='id'
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3 4'
             )
         """)
         
-        # Triggers to keep FTS5 table in sync
+        # Rank by BM25 with matches in the parsed message weighted higher.
+        # Set as the table's rank function so ORDER BY rank keeps FTS5's
+        # top-k optimization
+        cursor.execute("INSERT INTO logs_fts(logs_fts, rank) VALUES ('rank', 'bm25(1.0, 2.0)')")
+        
+        # Key/value metadata about the index (e.g. cached entry counts)
         cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS logs_ai AFTER INSERT ON logs BEGIN
-                INSERT INTO logs_fts(rowid, raw_text, message)
-                VALUES (new.id, new.raw_text, new.message);
-            END
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
         """)
         
+        # Trigger to keep FTS5 table in sync on deletes; inserts are added to
+        # the FTS5 table in bulk at the end of index_file() instead of per row
+        cursor.execute("DROP TRIGGER IF EXISTS logs_ai")
+        
         cursor.execute("""
             CREATE TRIGGER IF NOT EXISTS logs_ad AFTER DELETE ON logs BEGIN
                 DELETE FROM logs_fts WHERE rowid = old.id;
@@ -77,7 +148,7 @@ class LogIndexer:
         
         self.conn.commit()
     
-    def index_file(self, filepath: str, source_name: str = None, format: str = "auto"):
+    def index_file(self, filepath: str, source_name: str = None, format: str = "auto", bulk: bool = False):
         """
         Index a log file.
         
@@ -85,18 +156,20 @@ class LogIndexer:
             filepath: Path to log file
             source_name: Optional name for this log source (defaults to filename)
             format: Log format ("auto", "openstack", "json", "csv", "plain")
+            bulk: Only store the entries; they are not searchable until
+                  rebuild_fts() is called after the last file
         """
         if source_name is None:
             source_name = Path(filepath).name
         
         cursor = self.conn.cursor()
         
-        # Parse and insert logs in batches
-        batch_size = 1000
-        batch = []
+        # Rows after this ID are the ones added by this call
+        last_id = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM logs").fetchone()[0]
         
-        for entry in LogParser.parse_file(filepath, format=format):
-            batch.append((
+        # Stream parsed entries into SQLite, all in one transaction
+        cursor.executemany(_INSERT_LOG_SQL, (
+            (
                 source_name,
                 entry.line_number,
                 entry.raw_text,
@@ -104,26 +177,30 @@ class LogIndexer:
                 entry.level,
                 entry.component,
                 entry.message,
-                json.dumps(entry.metadata) if entry.metadata else None
-            ))
-            
-            if len(batch) >= batch_size:
-                cursor.executemany("""
-                    INSERT INTO logs (source_file, line_number, raw_text, timestamp, 
-                                     level, component, message, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, batch)
-                batch = []
-        
-        # Insert remaining
-        if batch:
-            cursor.executemany("""
-                INSERT INTO logs (source_file, line_number, raw_text, timestamp,
-                                 level, component, message, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, batch)
+                _metadata_json(entry.metadata)
+            )
+            for entry in LogParser.parse_file(filepath, format=format)
+        ))
+        
+        # Index the new rows for full-text search in one statement
+        if not bulk:
+            cursor.execute("""
+                INSERT INTO logs_fts(rowid, raw_text, message)
+                SELECT id, raw_text, message FROM logs WHERE id > ?
+            """, (last_id,))
         
         self.conn.commit()
+        
+        with self._query_cache_lock:
+            self._query_cache.clear()
+    
+    def rebuild_fts(self):
+        """Rebuild the full-text index from the logs table (after bulk indexing)."""
+        self.conn.execute("INSERT INTO logs_fts(logs_fts) VALUES ('rebuild')")
+        self.conn.commit()
+        
+        with self._query_cache_lock:
+            self._query_cache.clear()
     
     def search(
         self,
@@ -131,7 +208,8 @@ class LogIndexer:
         limit: int = 20,
         level: str = None,
         component: str = None,
-        source_file: str = None
+        source_file: str = None,
+        fields: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Search logs using full-text search.
@@ -142,25 +220,34 @@ class LogIndexer:
             level: Filter by log level (e.g., "ERROR", "INFO")
             component: Filter by component name
             source_file: Filter by source file
+            fields: Columns to return (default: all); metadata is only
+                    decoded when requested
         
         Returns:
             List of matching log entries with relevance scores
         """
+        if fields is None:
+            fields = _LOG_FIELDS
+        else:
+            fields = tuple(fields)
+            unknown = set(fields) - set(_LOG_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown log fields: {sorted(unknown)}")
+        
+        cache_key = (query, limit, level, component, source_file, fields)
+        if self.query_cache_size:
+            with self._query_cache_lock:
+                cached = self._query_cache.get(cache_key)
+                if cached is not None:
+                    self._query_cache.move_to_end(cache_key)
+                    return [self._copy_result(result) for result in cached]
+        
         cursor = self.conn.cursor()
         
         # Build query with filters
-        sql = """
-            SELECT 
-                logs.id,
-                logs.source_file,
-                logs.line_number,
-                logs.raw_text,
-                logs.timestamp,
-                logs.level,
-                logs.component,
-                logs.message,
-                logs.metadata,
-                logs_fts.rank as score
+        columns = "".join(f"logs.{field}, " for field in fields)
+        sql = f"""
+            SELECT {columns}logs_fts.rank as score
             FROM logs_fts
             JOIN logs ON logs.id = logs_fts.rowid
             WHERE logs_fts MATCH ?
@@ -185,20 +272,14 @@ class LogIndexer:
         
         cursor.execute(sql, params)
         
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                "id": row["id"],
-                "source_file": row["source_file"],
-                "line_number": row["line_number"],
-                "raw_text": row["raw_text"],
-                "timestamp": row["timestamp"],
-                "level": row["level"],
-                "component": row["component"],
-                "message": row["message"],
-                "metadata": json.loads(row["metadata"]) if row["metadata"] else {},
-                "score": row["score"]
-            })
+        results = [self._row_to_dict(row) for row in cursor]
+        
+        if self.query_cache_size:
+            with self._query_cache_lock:
+                self._query_cache[cache_key] = results
+                if len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+            return [self._copy_result(result) for result in results]
         
         return results
     
@@ -210,19 +291,7 @@ class LogIndexer:
         """, (log_id,))
         
         row = cursor.fetchone()
-        if row:
-            return {
-                "id": row["id"],
-                "source_file": row["source_file"],
-                "line_number": row["line_number"],
-                "raw_text": row["raw_text"],
-                "timestamp": row["timestamp"],
-                "level": row["level"],
-                "component": row["component"],
-                "message": row["message"],
-                "metadata": json.loads(row["metadata"]) if row["metadata"] else {}
-            }
-        return None
+        return self._row_to_dict(row) if row else None
     
     def get_context(
         self,
@@ -241,41 +310,32 @@ class LogIndexer:
         Returns:
             List of log entries (including target)
         """
-        cursor = self.conn.cursor()
-        
-        # Get the target entry to know its source and line number
-        target = self.get_by_id(log_id)
-        if not target:
-            return []
-        
-        # Get surrounding lines from same source
-        cursor.execute("""
-            SELECT * FROM logs
-            WHERE source_file = ?
-              AND line_number >= ?
-              AND line_number <= ?
-            ORDER BY line_number
-        """, (
-            target["source_file"],
-            target["line_number"] - before,
-            target["line_number"] + after
-        ))
+        # Target and surrounding lines from the same source in one query
+        cursor = self.conn.execute("""
+            SELECT logs.* FROM logs AS target
+            JOIN logs ON logs.source_file = target.source_file
+                     AND logs.line_number BETWEEN target.line_number - ? AND target.line_number + ?
+            WHERE target.id = ?
+            ORDER BY logs.line_number
+        """, (before, after, log_id))
         
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                "id": row["id"],
-                "source_file": row["source_file"],
-                "line_number": row["line_number"],
-                "raw_text": row["raw_text"],
-                "timestamp": row["timestamp"],
-                "level": row["level"],
-                "component": row["component"],
-                "message": row["message"],
-                "metadata": json.loads(row["metadata"]) if row["metadata"] else {}
-            })
-        
-        return results
+        return [self._row_to_dict(row) for row in cursor]
+    
+    @staticmethod
+    def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a cached search result that shares no mutable state with the cache."""
+        result = dict(result)
+        if result.get("metadata"):
+            result["metadata"] = copy.deepcopy(result["metadata"])
+        return result
+    
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        """Log entry dict from a row of the logs table, with decoded metadata (if selected)."""
+        entry = dict(row)
+        if "metadata" in entry:
+            entry["metadata"] = _loads(entry["metadata"]) if entry["metadata"] else {}
+        return entry
     
     def count_logs(self) -> int:
         """Get total number of indexed log entries."""
@@ -289,6 +349,60 @@ class LogIndexer:
         cursor.execute("SELECT DISTINCT source_file FROM logs")
         return [row[0] for row in cursor.fetchall()]
     
+    def get_meta(self, key: str) -> Optional[str]:
+        """Get an index metadata value."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT value FROM meta WHERE key = ?", (key,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    
+    def set_meta(self, key: str, value: str):
+        """Set an index metadata value."""
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+        self.conn.commit()
+    
+    def save(self, path: str):
+        """
+        Write a copy of the index to a database file.
+        
+        Args:
+            path: Destination SQLite file, replaced if it exists
+        """
+        target = sqlite3.connect(path)
+        try:
+            self.conn.backup(target)
+        finally:
+            target.close()
+    
+    @classmethod
+    def load(cls, path: str, in_memory: bool = False) -> "LogIndexer":
+        """
+        Open an index written by save() (or built with a file db_path).
+        
+        Args:
+            path: SQLite file to open
+            in_memory: Copy the index into memory instead of querying the file
+        
+        Returns:
+            LogIndexer on the saved index
+        """
+        if not Path(path).exists():
+            raise FileNotFoundError(f"Index file not found: {path}")
+        if not in_memory:
+            return cls(db_path=path)
+        
+        indexer = cls(db_path=":memory:")
+        source = sqlite3.connect(path)
+        try:
+            source.backup(indexer.conn)
+        finally:
+            source.close()
+        return indexer
+    
+    def vacuum(self):
+        """Compact the database file after indexing."""
+        self.conn.execute("VACUUM")
+    
     def close(self):
         """Close database connection."""
         self.conn.close()
@@ -6,56 +6,70 @@ Extracts structured information from logs.
 import re
 import json
 import csv
-from typing import List, Dict, Any, Iterator
+import itertools
+import mmap
+import os
+from typing import List, Dict, Any, Iterator, Tuple, NamedTuple, Optional
 from pathlib import Path
-from datetime import datetime
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
 
-class LogEntry:
-    """Structured log entry."""
+try:
+    import orjson
+except ImportError:  # Optional dependency, fall back to the stdlib decoder
+    orjson = None
+
+
+# Both accept bytes; orjson.JSONDecodeError subclasses json.JSONDecodeError
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# JSON log keys that fill LogEntry fields rather than metadata
+_JSON_ENTRY_KEYS = frozenset(('timestamp', 'time', 'level', 'severity', 'component', 'logger', 'message', 'msg'))
+
+
+class LogEntry(NamedTuple):
+    """Structured log entry (metadata is None when there is none)."""
     
-    def __init__(
-        self,
-        line_number: int,
-        raw_text: str,
-        timestamp: str = None,
-        level: str = None,
-        component: str = None,
-        message: str = None,
-        metadata: Dict = None
-    ):
-        self.line_number = line_number
-        self.raw_text = raw_text
-        self.timestamp = timestamp
-        self.level = level
-        self.component = component
-        self.message = message
-        self.metadata = metadata or {}
+    line_number: int
+    raw_text: str
+    timestamp: Optional[str] = None
+    level: Optional[str] = None
+    component: Optional[str] = None
+    message: Optional[str] = None
+    metadata: Optional[Dict] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "line_number": self.line_number,
-            "raw_text": self.raw_text,
-            "timestamp": self.timestamp,
-            "level": self.level,
-            "component": self.component,
-            "message": self.message,
-            "metadata": self.metadata
-        }
+        entry = self._asdict()
+        if not entry["metadata"]:
+            entry["metadata"] = {}
+        return entry
 
 
 class LogParser:
     """Parse logs into structured entries."""
     
-    # OpenStack log pattern: timestamp PID LEVEL component [request_id ...] IP "request" status len time
-    OPENSTACK_PATTERN = re.compile(
-        r'(?P<filename>[\w\-\.]+)\s+'
-        r'(?P<timestamp>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d+)\s+'
-        r'(?P<pid>\d+)\s+'
-        r'(?P<level>\w+)\s+'
-        r'(?P<component>[\w\.]+)'
+    # One line of an OpenStack log file: filename, timestamp, PID, level and
+    # component when the line has them, then the rest of the line
+    # ([request_id ...] IP "request" status len time), then its terminator.
+    # Like text mode, "\r\n", "\r" and "\n" all end a line ([^\S\r\n] is
+    # whitespace within the line)
+    OPENSTACK_LINE_PATTERN = re.compile(
+        rb'(?P<line>(?:(?P<filename>\S+)[^\S\r\n]+'
+        rb'(?P<timestamp>\d{4}-\d{2}-\d{2}[^\S\r\n]+\d{2}:\d{2}:\d{2}\.\d+)[^\S\r\n]+'
+        rb'(?P<pid>\d+)[^\S\r\n]+'
+        rb'(?P<level>\w+)[^\S\r\n]+'
+        rb'(?P<component>[\w\.]+))?'
+        rb'(?P<rest>[^\r\n]*))'
+        rb'(?:\r\n|\r|\n)?'
     )
     
+    # One line of a plain text file, then its terminator
+    PLAIN_LINE_PATTERN = re.compile(rb'(?P<line>[^\r\n]*)(?:\r\n|\r|\n)?')
+    
     @staticmethod
     def parse_file(filepath: str, format: str = "auto") -> Iterator[LogEntry]:
         """
@@ -77,13 +91,11 @@ class LogParser:
             elif path.suffix == ".csv":
                 format = "csv"
             else:
-                # Try to detect OpenStack format
-                with open(filepath, 'r') as f:
-                    first_line = f.readline()
-                    if LogParser.OPENSTACK_PATTERN.match(first_line):
-                        format = "openstack"
-                    else:
-                        format = "plain"
+                # Try to detect OpenStack format, with the same bytes
+                # pattern the parser uses (no decoding needed)
+                with open(filepath, 'rb') as f:
+                    match = LogParser.OPENSTACK_LINE_PATTERN.match(f.readline())
+                format = "openstack" if match['level'] is not None else "plain"
         
         # Parse based on format
         if format == "openstack":
@@ -95,78 +107,145 @@ class LogParser:
         else:
             yield from LogParser._parse_plain(filepath)
     
+    @staticmethod
+    def _scan_lines(filepath: str, pattern: re.Pattern) -> Iterator[Tuple[int, re.Match]]:
+        """
+        Match a line pattern once per line, over a memory map of the file.
+        
+        Args:
+            filepath: Path to log file
+            pattern: Bytes pattern that matches any line, including an
+                     empty one, followed by its optional terminator
+        
+        Yields:
+            (line number, match) tuples
+        """
+        with open(filepath, 'rb') as f:
+            # Empty files cannot be mapped
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                size = len(mm)
+                # Each match consumes a whole line, so the next starts the next line
+                for line_num, match in enumerate(pattern.finditer(mm), 1):
+                    # The empty "line" after a final terminator
+                    if match.start() == size:
+                        break
+                    yield line_num, match
+    
     @staticmethod
     def _parse_openstack(filepath: str) -> Iterator[LogEntry]:
         """Parse OpenStack formatted logs."""
-        with open(filepath, 'r') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.rstrip('\n')
-                match = LogParser.OPENSTACK_PATTERN.match(line)
-                
-                if match:
-                    groups = match.groupdict()
-                    yield LogEntry(
-                        line_number=line_num,
-                        raw_text=line,
-                        timestamp=groups.get('timestamp'),
-                        level=groups.get('level'),
-                        component=groups.get('component'),
-                        message=line[match.end():].strip(),
-                        metadata={'pid': groups.get('pid')}
-                    )
-                else:
-                    # If no match, treat as plain text
-                    yield LogEntry(
-                        line_number=line_num,
-                        raw_text=line,
-                        message=line
-                    )
+        for line_num, match in LogParser._scan_lines(filepath, LogParser.OPENSTACK_LINE_PATTERN):
+            line = match['line'].decode('utf-8', 'replace')
+            
+            if match['level'] is not None:
+                yield LogEntry(
+                    line_number=line_num,
+                    raw_text=line,
+                    timestamp=match['timestamp'].decode('ascii'),
+                    level=match['level'].decode('ascii'),
+                    component=match['component'].decode('ascii'),
+                    message=match['rest'].decode('utf-8', 'replace').strip(),
+                    metadata={'pid': match['pid'].decode('ascii')}
+                )
+            else:
+                # If no match, treat as plain text
+                yield LogEntry(
+                    line_number=line_num,
+                    raw_text=line,
+                    message=line
+                )
     
     @staticmethod
     def _parse_json(filepath: str) -> Iterator[LogEntry]:
         """Parse JSON/JSONL formatted logs."""
-        with open(filepath, 'r') as f:
+        with open(filepath, 'rb') as f:
             for line_num, line in enumerate(f, 1):
                 try:
-                    data = json.loads(line)
-                    yield LogEntry(
-                        line_number=line_num,
-                        raw_text=line.rstrip('\n'),
-                        timestamp=data.get('timestamp') or data.get('time'),
-                        level=data.get('level') or data.get('severity'),
-                        component=data.get('component') or data.get('logger'),
-                        message=data.get('message') or data.get('msg'),
-                        metadata={k: v for k, v in data.items() 
-                                 if k not in ['timestamp', 'time', 'level', 'severity', 
-                                            'component', 'logger', 'message', 'msg']}
-                    )
+                    data = _json_loads(line)
                 except json.JSONDecodeError:
-                    yield LogEntry(line_number=line_num, raw_text=line.rstrip('\n'), message=line)
+                    text = line.decode('utf-8', errors='replace').replace('\r\n', '\n')
+                    yield LogEntry(line_number=line_num, raw_text=text.rstrip('\n'), message=text)
+                    continue
+                yield LogEntry(
+                    line_number=line_num,
+                    raw_text=line.rstrip(b'\r\n').decode('utf-8'),
+                    timestamp=data.get('timestamp') or data.get('time'),
+                    level=data.get('level') or data.get('severity'),
+                    component=data.get('component') or data.get('logger'),
+                    message=data.get('message') or data.get('msg'),
+                    metadata={k: v for k, v in data.items() if k not in _JSON_ENTRY_KEYS}
+                )
     
     @staticmethod
     def _parse_csv(filepath: str) -> Iterator[LogEntry]:
         """Parse CSV formatted logs."""
-        with open(filepath, 'r') as f:
-            reader = csv.DictReader(f)
-            for line_num, row in enumerate(reader, 2):  # Start at 2 (header is line 1)
-                yield LogEntry(
-                    line_number=line_num,
-                    raw_text=','.join(row.values()),
-                    timestamp=row.get('timestamp') or row.get('time'),
-                    level=row.get('level'),
-                    component=row.get('component'),
-                    message=row.get('message') or str(row),
-                    metadata=row
-                )
+        rows = LogParser._read_csv_arrow(filepath) if pa is not None else LogParser._read_csv_stdlib(filepath)
+        header = next(rows, None)
+        if not header:
+            return
+        
+        # Column positions of the LogEntry fields (last one wins for duplicate names)
+        index = {name: i for i, name in enumerate(header)}
+        timestamp_i, time_i, level_i, component_i, message_i = (
+            index.get(name) for name in ('timestamp', 'time', 'level', 'component', 'message')
+        )
+        width = len(header)
+        
+        for line_num, row in enumerate(rows, 2):  # Start at 2 (header is line 1)
+            if len(row) < width:
+                row = list(row) + [''] * (width - len(row))
+            metadata = dict(zip(header, row))
+            yield LogEntry(
+                line_number=line_num,
+                raw_text=','.join(row),
+                timestamp=(timestamp_i is not None and row[timestamp_i]) or (row[time_i] if time_i is not None else None),
+                level=row[level_i] if level_i is not None else None,
+                component=row[component_i] if component_i is not None else None,
+                message=(message_i is not None and row[message_i]) or str(metadata),
+                metadata=metadata
+            )
+    
+    @staticmethod
+    def _read_csv_stdlib(filepath: str) -> Iterator[List[str]]:
+        """The header, then each non-empty row, read with the csv module."""
+        with open(filepath, 'r', newline='') as f:
+            yield from filter(None, csv.reader(f))
+    
+    @staticmethod
+    def _read_csv_arrow(filepath: str) -> Iterator[List[str]]:
+        """The header, then each row, parsed in record batches by pyarrow."""
+        with open(filepath, 'r', newline='') as f:
+            header = next(csv.reader(f), None)
+        if not header:
+            return
+        yield header
+        
+        rows_read = 0
+        try:
+            # Keep every value a string, as the csv module does
+            reader = pa_csv.open_csv(
+                filepath,
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                convert_options=pa_csv.ConvertOptions(column_types={name: pa.string() for name in header})
+            )
+            for batch in reader:
+                for row in zip(*(column.to_pylist() for column in batch.columns)):
+                    yield row
+                    rows_read += 1
+        except pa.ArrowInvalid:
+            # Ragged rows or invalid UTF-8: the csv module reads the rest,
+            # so the file parses the same with or without pyarrow
+            yield from itertools.islice(LogParser._read_csv_stdlib(filepath), rows_read + 1, None)
     
     @staticmethod
     def _parse_plain(filepath: str) -> Iterator[LogEntry]:
         """Parse plain text logs."""
-        with open(filepath, 'r') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.rstrip('\n')
-                yield LogEntry(
-                    line_number=line_num,
-                    raw_text=line,
-                    message=line
-                )
+        for line_num, match in LogParser._scan_lines(filepath, LogParser.PLAIN_LINE_PATTERN):
+            line = match['line'].decode('utf-8', 'replace')
+            yield LogEntry(
+                line_number=line_num,
+                raw_text=line,
+                message=line
+            )
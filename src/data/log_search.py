@@ -3,6 +3,9 @@ Search interface for agents.
 Provides simple, stateful search tools backed by SQLite FTS5.
 """
 
+import hashlib
+import os
+from pathlib import Path
 from typing import List, Dict, Any, Optional
 from .log_indexer import LogIndexer
 
@@ -10,26 +13,75 @@ from .log_indexer import LogIndexer
 # Global indexer instance
 _indexer: Optional[LogIndexer] = None
 
+# Whether the current index was loaded from the on-disk cache
+_index_cached: bool = False
 
-def initialize_search(log_sources: List[str], db_path: str = ":memory:"):
+# Part of cached index file names; bump when the index schema or log parsing changes
+_INDEX_SCHEMA_VERSION = 4
+
+
+def initialize_search(log_sources: List[str], db_path: str = ":memory:", cache_dir: Optional[str] = None):
     """
     Initialize search system with log files.
     
+    With a cache_dir, the index is stored in a file keyed by the path, mtime
+    and size of every log source, and reused as long as none of them change.
+    
     Args:
         log_sources: List of log file paths to index
-        db_path: SQLite database path (":memory:" for in-memory)
+        db_path: SQLite database path (":memory:" for in-memory), ignored
+                 when cache_dir is given
+        cache_dir: Optional directory for cached index files
     
     Returns:
         Number of logs indexed
     """
-    global _indexer
+    global _indexer, _index_cached
+    
+    _index_cached = False
+    
+    if cache_dir is not None:
+        db_path = str(_cached_index_path(log_sources, cache_dir))
+        if os.path.exists(db_path):
+            _indexer = LogIndexer(db_path=db_path)
+            num_logs = _indexer.get_meta("num_logs")
+            if num_logs is not None:
+                _index_cached = True
+                return int(num_logs)
+            # Incomplete index (e.g. interrupted run), rebuild it
+            _indexer.close()
+            os.remove(db_path)
     
     _indexer = LogIndexer(db_path=db_path)
     
+    # Nothing to lose on a crash mid-build (an incomplete cached index is
+    # rebuilt), so skip syncing; the FTS index is built once at the end
+    _indexer.conn.execute("PRAGMA synchronous=OFF")
     for source in log_sources:
-        _indexer.index_file(source)
+        _indexer.index_file(source, bulk=True)
+    _indexer.rebuild_fts()
+    _indexer.conn.execute("PRAGMA synchronous=NORMAL")
+    
+    num_logs = _indexer.count_logs()
+    
+    if cache_dir is not None:
+        _indexer.vacuum()
+        _indexer.set_meta("num_logs", str(num_logs))
+    
+    return num_logs
+
+
+def _cached_index_path(log_sources: List[str], cache_dir: str) -> Path:
+    """Index file path keyed by the identity of all log sources."""
+    fingerprint = f"v{_INDEX_SCHEMA_VERSION}\n" + "\n".join(
+        f"{os.path.abspath(path)}|{os.path.getmtime(path)}|{os.path.getsize(path)}"
+        for path in log_sources
+    )
+    key = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
     
-    return _indexer.count_logs()
+    cache_path = Path(cache_dir)
+    cache_path.mkdir(parents=True, exist_ok=True)
+    return cache_path / f"logs_{key}.sqlite"
 
 
 def get_indexer() -> Optional[LogIndexer]:
@@ -42,7 +94,8 @@ def search_logs(
     limit: int = 20,
     level: str = None,
     component: str = None,
-    source: str = None
+    source: str = None,
+    fields: Optional[List[str]] = None
 ) -> List[Dict[str, Any]]:
     """
     Search logs using keyword query.
@@ -59,6 +112,7 @@ def search_logs(
         level: Filter by log level (ERROR, WARN, INFO, etc.)
         component: Filter by component name
         source: Filter by source file
+        fields: Columns to return (default: all)
     
     Returns:
         List of matching log entries with scores
@@ -71,7 +125,8 @@ def search_logs(
         limit=limit,
         level=level,
         component=component,
-        source_file=source
+        source_file=source,
+        fields=fields
     )
 
 
@@ -108,6 +163,7 @@ def get_search_stats() -> Dict[str, Any]:
     
     return {
         "initialized": True,
+        "cached": _index_cached,
         "total_logs": _indexer.count_logs(),
         "sources": _indexer.get_sources()
     }
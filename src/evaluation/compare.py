@@ -20,49 +20,62 @@ def compare_experiments(
     Args:
         experiment_files: List of experiment result JSON files
         ground_truth_file: Optional ground truth for evaluation
-        output_file: Optional path to save comparison CSV
+        output_file: Optional path to save comparison (CSV, or Parquet
+                     for a .parquet extension)
 
     Returns:
         DataFrame with comparison metrics
     """
-    results = []
-
-    for exp_file in experiment_files:
-        with open(exp_file, 'r') as f:
-            experiment = json.load(f)
-
-        # Calculate metrics
-        metrics = calculate_metrics(experiment, ground_truth_file)
-
-        # Extract key info
-        row = {
-            "experiment_name": experiment["metadata"]["experiment_name"],
-            "timestamp": experiment["metadata"]["timestamp"],
-            "workflow_type": metrics["workflow_type"],
-            "total_tokens": metrics["token_usage"].get("total_tokens", 0),
-            "output_length": metrics["output_length_words"],
-        }
-
-        # Add accuracy metrics if ground truth provided
-        if "event_detection" in metrics:
-            row.update({
-                "placeholder": 0.0,
-                # TODO: Add metrics to compare
-                # "event_detection_accuracy": metrics["event_detection"]["accuracy"],
-            })
-
-        results.append(row)
+    rows = [_evaluate_one(exp_file, ground_truth_file) for exp_file in experiment_files]
 
     # Create DataFrame
-    df = pd.DataFrame(results)
+    df = pd.DataFrame.from_records(rows)
 
     # Save if requested
     if output_file:
-        df.to_csv(output_file, index=False)
+        _save_comparison(df, output_file)
 
     return df
 
 
+def _save_comparison(df: pd.DataFrame, output_file: str):
+    """Write a comparison table as Parquet (.parquet extension) or CSV."""
+    if Path(output_file).suffix == ".parquet":
+        df.to_parquet(output_file, engine="pyarrow", index=False)
+    else:
+        # pyarrow's CSV writer quotes every string and formats floats
+        # differently, so CSV stays on pandas for a stable file format
+        df.to_csv(output_file, index=False)
+
+
+def _evaluate_one(exp_file: str, ground_truth_file: str = None) -> Dict[str, Any]:
+    """Load one experiment result and build its comparison row."""
+    with open(exp_file, 'r') as f:
+        experiment = json.load(f)
+
+    # Calculate metrics
+    metrics = calculate_metrics(experiment, ground_truth_file)
+
+    # Extract key info
+    row = {
+        "experiment_name": experiment["metadata"]["experiment_name"],
+        "timestamp": experiment["metadata"]["timestamp"],
+        "workflow_type": metrics["workflow_type"],
+        "total_tokens": metrics["token_usage"].get("total_tokens", 0),
+        "output_length": metrics["output_length_words"],
+    }
+
+    # Add accuracy metrics if ground truth provided
+    if "event_detection" in metrics:
+        row.update({
+            "placeholder": 0.0,
+            # TODO: Add metrics to compare
+            # "event_detection_accuracy": metrics["event_detection"]["accuracy"],
+        })
+
+    return row
+
+
 def summarize_comparison(df: pd.DataFrame) -> Dict[str, Any]:
     """
     Generate summary statistics from comparison DataFrame.
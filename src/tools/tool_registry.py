@@ -2,7 +2,9 @@
 Central registry for all tools available to agents.
 """
 
-from typing import Dict, Any, Callable
+import functools
+from types import MappingProxyType
+from typing import Dict, Any, Callable, Mapping, Tuple
 from .file_tools import read_file, list_files, FILE_TOOLS_SCHEMAS
 from .search_tools import search_logs, get_log_context, SEARCH_TOOLS_SCHEMAS
 
@@ -55,19 +57,28 @@ def get_tool_registry() -> Dict[str, Dict[str, Any]]:
     return registry
 
 
-def get_tools_for_agent(tool_names: list) -> Dict[str, Dict[str, Any]]:
+def get_tools_for_agent(tool_names: list) -> Mapping[str, Dict[str, Any]]:
     """
     Get a subset of tools for a specific agent.
 
+    Registries are memoized by tool list, so agents with the same tools (in
+    the same order) share one read-only registry.
+
     Args:
         tool_names: List of tool names to include
 
     Returns:
-        Filtered tool registry
+        Filtered tool registry, in the order of tool_names
 
     Raises:
         ValueError: If a tool name is not found
     """
+    return _get_tools_for_agent_cached(tuple(dict.fromkeys(tool_names)))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_tools_for_agent_cached(tool_names: Tuple[str, ...]) -> Mapping[str, Dict[str, Any]]:
+    """Build the registry subset for a tool list (errors are not cached)."""
     full_registry = get_tool_registry()
     agent_registry = {}
 
@@ -76,4 +87,4 @@ def get_tools_for_agent(tool_names: list) -> Dict[str, Dict[str, Any]]:
             raise ValueError(f"Tool '{tool_name}' not found in registry")
         agent_registry[tool_name] = full_registry[tool_name]
 
-    return agent_registry
+    return MappingProxyType(agent_registry)
@@ -1,5 +1,7 @@
 """Tests for agent.py"""
 
+import asyncio
+import json
 import pytest
 from pathlib import Path
 import sys
@@ -7,6 +9,7 @@ import sys
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from core import agent as agent_module
 from core.agent import Agent, AgentConfig
 
 def test_format_context():
@@ -31,5 +34,187 @@ def test_format_context():
         assert line in formatted
 
 
+def test_execute_tool_calls_preserves_order():
+    import time
+
+    def echo(value, delay):
+        time.sleep(delay)
+        return value
+
+    registry = {"echo": {"function": echo, "schema": {}}}
+    agent = Agent(AgentConfig(name="test-agent", model="test-model", system_prompt="", tools=["echo"]), llm_client=None, tool_registry=registry)
+
+    tool_calls = [
+        {"id": "1", "name": "echo", "arguments": '{"value": "first", "delay": 0.05}'},
+        {"id": "2", "name": "echo", "arguments": '{"value": "second", "delay": 0.0}'},
+        {"id": "3", "name": "missing", "arguments": "{}"},
+    ]
+
+    messages = agent._execute_tool_calls(tool_calls)
+
+    assert [m["tool_call_id"] for m in messages] == ["1", "2", "3"]
+    assert messages[0]["content"] == "first"
+    assert messages[1]["content"] == "second"
+    assert messages[2]["content"].startswith("Error executing tool")
+
+
+class FakeClient:
+    """LLMClient stand-in that calls a tool once, then answers."""
+
+    def __init__(self):
+        self.sent = []
+
+    def complete(self, messages, **kwargs):
+        self.sent.append(list(messages))
+        usage = {"input_tokens": 1, "output_tokens": 1, "total_tokens": 2}
+        if len(self.sent) == 1:
+            tool_calls = [{"id": "1", "name": "echo", "arguments": '{"value": "x"}'}]
+            return {"content": "", "tool_calls": tool_calls, "usage": usage}
+        return {"content": "done", "tool_calls": [], "usage": usage}
+
+
+def test_history_deltas_reconstruct_messages():
+    registry = {"echo": {"function": lambda value: value, "schema": {}}}
+    client = FakeClient()
+    agent = Agent(AgentConfig(name="test-agent", model="test-model", system_prompt="", tools=["echo"]), llm_client=client, tool_registry=registry)
+
+    result = agent.run("task")
+
+    assert result["content"] == "done"
+    assert len(result["history"][0]["messages_delta"]) == 1
+    assert len(result["history"][1]["messages_delta"]) == 2
+    assert agent.reconstruct_messages(1) == client.sent[0]
+    assert agent.reconstruct_messages(2) == client.sent[1]
+
+
+USAGE = {"input_tokens": 1, "output_tokens": 1, "total_tokens": 2}
+
+
+def echo_call(call_id, value):
+    return {"id": call_id, "name": "echo", "arguments": json.dumps({"value": value})}
+
+
+class ScriptedClient:
+    """LLMClient stand-in returning scripted responses (tool calls, then an answer)."""
+
+    def __init__(self, tool_call_rounds, answer="done"):
+        self.responses = [{"content": "", "tool_calls": calls, "usage": USAGE} for calls in tool_call_rounds]
+        self.responses.append({"content": answer, "tool_calls": [], "usage": USAGE})
+        self.sent = []
+
+    def complete(self, messages, **kwargs):
+        self.sent.append(list(messages))
+        return self.responses[len(self.sent) - 1]
+
+    async def acomplete(self, messages, on_text=None, **kwargs):
+        response = self.complete(messages, **kwargs)
+        if on_text is not None and response["content"]:
+            on_text(response["content"])
+        return response
+
+
+def test_tool_call_log_written_and_tail_bounded(tmp_path, monkeypatch):
+    log_path = tmp_path / "tool_calls.jsonl"
+    opened = []
+
+    def counting_open(path, *args, **kwargs):
+        opened.append(path)
+        return open(path, *args, **kwargs)
+
+    monkeypatch.setattr(agent_module, "open", counting_open, raising=False)
+    registry = {"echo": {"function": lambda value: value.upper(), "schema": {}}}
+    client = ScriptedClient([[echo_call("1", "a"), echo_call("2", "b")], [echo_call("3", "c")]])
+    config = AgentConfig(
+        name="test-agent", model="test-model", system_prompt="", tools=["echo"],
+        tool_call_log_path=str(log_path), tool_call_log_tail=2
+    )
+
+    result = Agent(config, llm_client=client, tool_registry=registry).run("task")
+
+    records = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [(r["iteration"], r["id"], r["result"]) for r in records] == [(1, "1", "A"), (1, "2", "B"), (2, "3", "C")]
+    assert all(r["agent"] == "test-agent" for r in records)
+    # The file is opened once per run, the returned calls keep only the tail
+    assert opened == [str(log_path)]
+    assert [call["id"] for call in result["tool_calls"]] == ["2", "3"]
+
+
+def test_tool_call_log_appends_across_async_runs(tmp_path):
+    log_path = tmp_path / "tool_calls.jsonl"
+    registry = {"echo": {"function": lambda value: value, "schema": {}}}
+    config = AgentConfig(
+        name="test-agent", model="test-model", system_prompt="", tools=["echo"],
+        tool_call_log_path=str(log_path), tool_call_log_tail=1
+    )
+
+    for value in ["x", "y"]:
+        agent = Agent(config, llm_client=ScriptedClient([[echo_call("1", value)]]), tool_registry=registry)
+        result = asyncio.run(agent.arun("task"))
+        assert len(result["tool_calls"]) == 1
+
+    assert [json.loads(line)["result"] for line in log_path.read_text().splitlines()] == ["x", "y"]
+
+
+def test_arun_reports_tool_turns_to_stream_consumer():
+    registry = {"echo": {"function": lambda value: value, "schema": {}}}
+    client = ScriptedClient([[echo_call("1", "x")]], answer="final")
+    client.responses[0]["content"] = "checking"
+    agent = Agent(AgentConfig(name="test-agent", model="test-model", system_prompt="", tools=["echo"]), llm_client=client, tool_registry=registry)
+    events = []
+
+    asyncio.run(agent.arun("task", on_text=events.append, on_tool_turn=lambda: events.append(None)))
+
+    assert events == ["checking", None, "final"]
+
+
+class RepeatingClient:
+    """Async LLMClient stand-in that repeats a tool call once, then answers with its result."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def acomplete(self, messages, **kwargs):
+        self.sent.append(list(messages))
+        tool_results = [m["content"] for m in messages if m["role"] == "tool"]
+        if len(tool_results) < 2:
+            return {"content": "", "tool_calls": [echo_call(str(len(tool_results) + 1), "x")], "usage": USAGE}
+        return {"content": f"answer after {tool_results[-1]}", "tool_calls": [], "usage": USAGE}
+
+
+def speculative_agent(client, tool):
+    config = AgentConfig(name="test-agent", model="test-model", system_prompt="", tools=["echo"], speculative=True)
+    return Agent(config, llm_client=client, tool_registry={"echo": {"function": tool, "schema": {}}})
+
+
+def test_speculative_hit_reuses_response():
+    client = RepeatingClient()
+    agent = speculative_agent(client, lambda value: f"result {value}")
+
+    result = asyncio.run(agent.arun("task"))
+
+    # The repeated call's result was predicted correctly, so the response
+    # computed while the tool ran is the final one; no fourth call is made
+    assert result["content"] == "answer after result x"
+    assert len(client.sent) == 3
+    assert result["usage"]["speculative_hits"] == 1
+    assert result["usage"]["speculative_misses"] == 0
+
+
+def test_speculative_miss_requests_again():
+    client = RepeatingClient()
+    counter = iter(range(1, 10))
+    agent = speculative_agent(client, lambda value: f"result {next(counter)}")
+
+    result = asyncio.run(agent.arun("task"))
+
+    # The second call returned a new result, so the speculative response
+    # (built on "result 1") is discarded and the request is made again
+    assert result["content"] == "answer after result 2"
+    assert len(client.sent) == 4
+    assert [m["content"] for m in client.sent[-1] if m["role"] == "tool"] == ["result 1", "result 2"]
+    assert result["usage"]["speculative_hits"] == 0
+    assert result["usage"]["speculative_misses"] == 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -8,7 +8,7 @@ import sys
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from core.config_loader import load_config
+from core.config_loader import load_config, sanitize_config, _read_config_file, _parse_config_file
 
 
 def test_load_valid_config():
@@ -53,5 +53,68 @@ def test_missing_config_file():
         load_config("nonexistent.yaml")
 
 
+def test_sanitize_config():
+    """Test that the API key is redacted without mutating the config."""
+    config = {"experiment": {"name": "x"}, "llm": {"provider": "openai", "api_key": "secret"}}
+
+    sanitized = sanitize_config(config)
+
+    assert sanitized["llm"]["api_key"] == "***REDACTED***"
+    assert sanitized["llm"]["provider"] == "openai"
+    assert config["llm"]["api_key"] == "secret"
+
+
+def _sidecars(config_path):
+    """Return the JSON sidecar caches written next to a config file."""
+    return sorted(config_path.parent.glob(config_path.name + ".*.cache.json"))
+
+
+def test_config_sidecar_used_when_fresh(tmp_path):
+    """Test that a fresh JSON sidecar is read instead of the YAML."""
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("experiment:\n  name: yaml\n")
+    _parse_config_file.cache_clear()
+
+    assert _read_config_file(str(config_path)) == {"experiment": {"name": "yaml"}}
+    sidecars = _sidecars(config_path)
+    assert len(sidecars) == 1
+
+    # The YAML is unchanged, so a new process would read the sidecar
+    sidecars[0].write_text('{"experiment": {"name": "sidecar"}}')
+    _parse_config_file.cache_clear()
+    assert _read_config_file(str(config_path)) == {"experiment": {"name": "sidecar"}}
+
+
+def test_config_sidecar_stale_after_edit(tmp_path):
+    """Test that editing the YAML invalidates and removes the old sidecar."""
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("experiment:\n  name: old\n")
+    _parse_config_file.cache_clear()
+    _read_config_file(str(config_path))
+    old_sidecars = _sidecars(config_path)
+
+    config_path.write_text("experiment:\n  name: edited\n")
+    _parse_config_file.cache_clear()
+
+    assert _read_config_file(str(config_path)) == {"experiment": {"name": "edited"}}
+    new_sidecars = _sidecars(config_path)
+    assert len(new_sidecars) == 1
+    assert new_sidecars != old_sidecars
+
+
+def test_config_sidecar_skipped_for_lossy_json(tmp_path):
+    """Test that configs JSON cannot round-trip are not cached as JSON."""
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("thresholds:\n  1: low\n  2: high\n")
+    _parse_config_file.cache_clear()
+
+    config = _read_config_file(str(config_path))
+
+    assert config == {"thresholds": {1: "low", 2: "high"}}
+    assert _sidecars(config_path) == []
+    _parse_config_file.cache_clear()
+    assert _read_config_file(str(config_path)) == config
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
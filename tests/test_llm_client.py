@@ -0,0 +1,318 @@
+"""Tests for llm_client.py"""
+
+import asyncio
+import gc
+import pytest
+from pathlib import Path
+import sys
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core import llm_client
+from core.llm_client import LLMClient, RateLimiter
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class ProviderError(Exception):
+    """Provider error carrying an HTTP status code, like LiteLLM's."""
+
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def fake_response(content="ok", total_tokens=3):
+    """LiteLLM-shaped completion response."""
+    message = SimpleNamespace(content=content, tool_calls=None)
+    usage = SimpleNamespace(prompt_tokens=1, completion_tokens=total_tokens - 1, total_tokens=total_tokens)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+def fake_litellm(monkeypatch, completion=None, acompletion=None):
+    """Replace LiteLLM with the given completion functions."""
+    fake = SimpleNamespace(client_session=None, aclient_session=None, completion=completion, acompletion=acompletion)
+    monkeypatch.setattr(llm_client, "_litellm", lambda: fake)
+    monkeypatch.setattr(llm_client, "_backoff_delay", lambda attempt: 0)
+    return fake
+
+
+def failing_then_ok(errors, calls):
+    """Async completion raising the given errors in turn, then succeeding."""
+    async def acompletion(**kwargs):
+        calls.append(kwargs["model"])
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return fake_response()
+    return acompletion
+
+
+def test_rate_limiter_request_window():
+    clock = FakeClock()
+    limiter = RateLimiter(rpm=2, clock=clock)
+
+    assert limiter._reserve() == 0
+    clock.now = 10
+    assert limiter._reserve() == 0
+    clock.now = 20
+    # The first request leaves the window 60s after it was made
+    assert limiter._reserve() == pytest.approx(40)
+    clock.now = 60
+    assert limiter._reserve() == 0
+    assert limiter._reserve() == pytest.approx(10)
+
+
+def test_rate_limiter_token_window():
+    clock = FakeClock()
+    limiter = RateLimiter(tpm=100, clock=clock)
+
+    assert limiter._reserve() == 0
+    limiter.record_tokens(60)
+    clock.now = 30
+    assert limiter._reserve() == 0
+    limiter.record_tokens(60)
+    clock.now = 45
+    assert limiter._reserve() == pytest.approx(15)
+    clock.now = 60
+    assert limiter._reserve() == 0
+
+
+def test_rate_limiter_wait_sleeps_until_budget(monkeypatch):
+    clock = FakeClock()
+    limiter = RateLimiter(rpm=1, clock=clock)
+    monkeypatch.setattr(llm_client.time, "sleep", clock.sleep)
+
+    limiter.wait()
+    limiter.wait()
+
+    assert clock.now == pytest.approx(60)
+
+
+def test_acomplete_retries_rate_limits_and_server_errors(monkeypatch):
+    calls = []
+    fake_litellm(monkeypatch, acompletion=failing_then_ok([ProviderError(429), ProviderError(503)], calls))
+    client = LLMClient(provider="openai")
+
+    response = asyncio.run(client.acomplete(model="gpt-4o", messages=[{"role": "user", "content": "hi"}]))
+
+    assert response["content"] == "ok"
+    assert len(calls) == 3
+
+
+def test_acomplete_does_not_retry_client_errors(monkeypatch):
+    calls = []
+    fake_litellm(monkeypatch, acompletion=failing_then_ok([ProviderError(400)], calls))
+    client = LLMClient(provider="openai")
+
+    with pytest.raises(Exception, match="status 400"):
+        asyncio.run(client.acomplete(model="gpt-4o", messages=[{"role": "user", "content": "hi"}]))
+    assert len(calls) == 1
+
+
+def test_acomplete_gives_up_after_max_retries(monkeypatch):
+    calls = []
+    fake_litellm(monkeypatch, acompletion=failing_then_ok([ProviderError(429)] * 5, calls))
+    client = LLMClient(provider="openai", max_retries=2)
+
+    with pytest.raises(Exception, match="status 429"):
+        asyncio.run(client.acomplete(model="gpt-4o", messages=[{"role": "user", "content": "hi"}]))
+    assert len(calls) == 3
+
+
+def test_complete_retries_and_uses_shared_limiter(monkeypatch):
+    calls = []
+
+    def completion(**kwargs):
+        calls.append(kwargs["model"])
+        if len(calls) == 1:
+            raise ProviderError(502)
+        return fake_response(total_tokens=7)
+
+    fake_litellm(monkeypatch, completion=completion)
+    limiter = RateLimiter(rpm=10, tpm=1000)
+    first = LLMClient(provider="openai", rate_limiter=limiter)
+    second = LLMClient(provider="openai", rate_limiter=limiter)
+
+    first.complete(model="gpt-4o", messages=[{"role": "user", "content": "a"}])
+    second.complete(model="gpt-4o", messages=[{"role": "user", "content": "b"}])
+
+    # Both clients count against one window, retries included
+    assert len(calls) == 3
+    assert len(limiter._request_times) == 3
+    assert [tokens for _, tokens in limiter._token_log] == [7, 7]
+
+
+def race_litellm(monkeypatch, delays, errors=()):
+    """Fake LiteLLM whose models answer after the given delays."""
+    started, cancelled = [], []
+
+    async def acompletion(**kwargs):
+        model = kwargs["model"]
+        started.append(model)
+        try:
+            await asyncio.sleep(delays[model])
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+        if model in errors:
+            raise ProviderError(400 + len(started))
+        return fake_response(content=model)
+
+    fake_litellm(monkeypatch, acompletion=acompletion)
+    return started, cancelled
+
+
+def test_acomplete_race_returns_first_success(monkeypatch):
+    race_litellm(monkeypatch, {"gpt-4o": 0.05, "gpt-4o-mini": 0}, errors={"gpt-4o"})
+    client = LLMClient(provider="openai")
+
+    response = asyncio.run(client.acomplete_race(["gpt-4o", "gpt-4o-mini"], messages=[{"role": "user", "content": "hi"}]))
+
+    assert response["content"] == "gpt-4o-mini"
+    assert response["model"] == "gpt-4o-mini"
+
+
+def test_acomplete_race_skips_failures(monkeypatch):
+    race_litellm(monkeypatch, {"gpt-4o": 0, "gpt-4o-mini": 0.01}, errors={"gpt-4o"})
+    client = LLMClient(provider="openai")
+
+    response = asyncio.run(client.acomplete_race(["gpt-4o", "gpt-4o-mini"], messages=[{"role": "user", "content": "hi"}]))
+
+    assert response["model"] == "gpt-4o-mini"
+
+
+def test_acomplete_race_all_fail_raises_last_error(monkeypatch):
+    race_litellm(monkeypatch, {"gpt-4o": 0, "gpt-4o-mini": 0.02}, errors={"gpt-4o", "gpt-4o-mini"})
+    client = LLMClient(provider="openai")
+
+    with pytest.raises(Exception, match="status 402"):
+        asyncio.run(client.acomplete_race(["gpt-4o", "gpt-4o-mini"], messages=[{"role": "user", "content": "hi"}]))
+
+
+def test_acomplete_race_cancels_losers(monkeypatch):
+    started, cancelled = race_litellm(monkeypatch, {"gpt-4o": 10, "gpt-4o-mini": 0})
+    client = LLMClient(provider="openai")
+
+    async def race():
+        response = await client.acomplete_race(["gpt-4o", "gpt-4o-mini"], messages=[{"role": "user", "content": "hi"}])
+        await asyncio.sleep(0)  # Let the cancellation reach the loser
+        return response
+
+    response = asyncio.run(race())
+
+    assert response["model"] == "gpt-4o-mini"
+    assert sorted(started) == ["gpt-4o", "gpt-4o-mini"]
+    assert cancelled == ["gpt-4o"]
+
+
+def test_acomplete_race_retrieves_all_errors(monkeypatch):
+    race_litellm(monkeypatch, {"gpt-4o": 0, "gpt-4o-mini": 0, "gpt-5": 0}, errors={"gpt-4o", "gpt-5"})
+    client = LLMClient(provider="openai")
+    unretrieved = []
+
+    async def race():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unretrieved.append(context))
+        return await client.acomplete_race(["gpt-4o", "gpt-4o-mini", "gpt-5"], messages=[{"role": "user", "content": "hi"}])
+
+    response = asyncio.run(race())
+
+    assert response["model"] == "gpt-4o-mini"
+    # Failed tasks finishing alongside the winner had their errors retrieved
+    gc.collect()
+    assert unretrieved == []
+
+
+def test_cache_key_normalization(monkeypatch):
+    fake_litellm(monkeypatch)
+    client = LLMClient(provider="openai", cache_size=8)
+    request = {
+        "model": "GPT-4o",
+        "messages": [{"role": "User", "content": "cafe\u0301"}],
+        "max_tokens": 10,
+        "temperature": 0.0
+    }
+    # Same request: NFC-composed text, lowercase, other key order, other endpoint
+    equivalent = {
+        "temperature": 0.0,
+        "max_tokens": 10,
+        "messages": [{"content": "caf\u00e9", "role": "user"}],
+        "model": "gpt-4o",
+        "api_base": "http://localhost:11434",
+        "stream": True
+    }
+
+    assert client._cache_key(request) == client._cache_key(equivalent)
+    assert client._cache_key(request) != client._cache_key(dict(request, temperature=0.5))
+    assert client._cache_key(request) != client._cache_key(
+        dict(request, messages=[{"role": "user", "content": "cafe"}])
+    )
+
+
+def test_cache_key_disabled_without_cache_size(monkeypatch):
+    fake_litellm(monkeypatch)
+    client = LLMClient(provider="openai")
+
+    assert client._cache_key({"model": "gpt-4o", "messages": []}) is None
+
+
+def test_cache_lru_eviction(monkeypatch):
+    fake_litellm(monkeypatch)
+    client = LLMClient(provider="openai", cache_size=2)
+    client._cache_put("a", {"content": "a"})
+    client._cache_put("b", {"content": "b"})
+
+    # Reading "a" makes "b" the least recently used entry
+    assert client._cache_get("a") == {"content": "a"}
+    client._cache_put("c", {"content": "c"})
+
+    assert client._cache_get("b") is None
+    assert client._cache_get("a") == {"content": "a"}
+    assert client._cache_get("c") == {"content": "c"}
+
+
+def test_cache_returns_isolated_copies(monkeypatch):
+    fake_litellm(monkeypatch)
+    client = LLMClient(provider="openai", cache_size=2)
+    response = {"content": "x", "tool_calls": [{"name": "t"}], "usage": {"total_tokens": 3}}
+    client._cache_put("k", response)
+
+    # Neither the stored response nor a returned copy affect later reads
+    response["tool_calls"].append({"name": "u"})
+    first = client._cache_get("k")
+    first["usage"]["total_tokens"] = 0
+
+    assert client._cache_get("k") == {"content": "x", "tool_calls": [{"name": "t"}], "usage": {"total_tokens": 3}}
+
+
+def test_complete_served_from_cache(monkeypatch):
+    calls = []
+
+    def completion(**kwargs):
+        calls.append(kwargs["model"])
+        return fake_response()
+
+    fake_litellm(monkeypatch, completion=completion)
+    client = LLMClient(provider="openai", cache_size=4)
+
+    first = client.complete(model="gpt-4o", messages=[{"role": "user", "content": "hi"}])
+    second = client.complete(model="GPT-4o", messages=[{"role": "user", "content": "hi"}])
+
+    assert first == second
+    assert len(calls) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
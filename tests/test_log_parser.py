@@ -0,0 +1,32 @@
+"""Tests for log parsing."""
+import pytest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from data.log_parser import LogParser
+
+
+@pytest.mark.parametrize("format", ["plain", "openstack"])
+def test_lone_carriage_return_ends_line(tmp_path, format):
+    log_file = tmp_path / "sample.log"
+    log_file.write_bytes(b"first\rsecond\r\nthird\n")
+
+    entries = list(LogParser.parse_file(str(log_file), format=format))
+    assert [entry.raw_text for entry in entries] == ["first", "second", "third"]
+    assert [entry.line_number for entry in entries] == [1, 2, 3]
+
+
+
+def test_csv_short_row_is_padded(tmp_path):
+    log_file = tmp_path / "sample.csv"
+    log_file.write_text("level,message\nINFO,started\nERROR\n")
+
+    entries = list(LogParser.parse_file(str(log_file)))
+    assert [entry.level for entry in entries] == ["INFO", "ERROR"]
+    assert entries[1].metadata == {"level": "ERROR", "message": ""}
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,278 @@
+"""Tests for orchestrator.py"""
+
+import asyncio
+import pytest
+from pathlib import Path
+import sys
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.orchestrator import SequentialWorkflow, HierarchicalWorkflow
+from core.agent import Agent, AgentConfig
+from core import llm_client
+from core.llm_client import LLMClient
+
+
+class FakeAgent:
+    """Agent stand-in that records the tasks it receives."""
+
+    def __init__(self, name, client=None):
+        self.name = name
+        self.client = client
+        self.config = SimpleNamespace(name=name, system_prompt=f"{name} specialist")
+        self.tasks = []
+        self.cache_prefixes = []
+        self.reply = None
+        self.tool_turn_text = None  # Streamed before a (simulated) tool call
+
+    def first_request(self, message, context=None):
+        return {"model": "m", "messages": [{"role": "user", "content": message}]}
+
+    async def arun(self, message, context=None, first_response=None, cache_prefix=None, on_text=None, on_tool_turn=None):
+        self.tasks.append(message)
+        self.cache_prefixes.append(cache_prefix)
+        if self.tool_turn_text and on_text is not None:
+            on_text(self.tool_turn_text)
+            if on_tool_turn is not None:
+                on_tool_turn()
+        content = first_response["content"] if first_response else (self.reply or f"{self.name} done")
+        if on_text is not None:
+            for i in range(0, len(content), 4):
+                on_text(content[i:i + 4])
+        return {
+            "content": content,
+            "tool_calls": [],
+            "usage": {"input_tokens": 1, "output_tokens": 2, "total_tokens": 3},
+            "history": [{"agent": self.name}]
+        }
+
+
+def test_sequential_parallel_groups():
+    agents = {name: FakeAgent(name) for name in ["a", "b", "c"]}
+    workflow = SequentialWorkflow(agents, {
+        "agent_sequence": ["a", "b", "c"],
+        "parallel_groups": [["a", "b"], ["c"]]
+    })
+
+    result = workflow.execute("task", {"log_source": "x.log"})
+
+    assert agents["a"].tasks == ["task"]
+    assert agents["b"].tasks == ["task"]
+    assert "a: a done" in agents["c"].tasks[0]
+    assert "b: b done" in agents["c"].tasks[0]
+    assert result["result"] == "c done"
+    assert result["usage"]["total_tokens"] == 9
+    assert len(result["execution_log"]) == 6
+
+
+def test_sequential_repeated_agent_step_numbers():
+    agents = {name: FakeAgent(name) for name in ["a", "b"]}
+    workflow = SequentialWorkflow(agents, {"agent_sequence": ["a", "b", "a"]})
+
+    result = workflow.execute("task", {})
+
+    assert len(agents["a"].tasks) == 2
+    assert [step["step"] for step in result["execution_log"]] == [
+        "agent_1_start", "agent_1_complete",
+        "agent_2_start", "agent_2_complete",
+        "agent_3_start", "agent_3_complete"
+    ]
+
+
+def test_execute_inside_running_loop_points_to_aexecute():
+    agents = {"a": FakeAgent("a")}
+    workflow = SequentialWorkflow(agents, {"agent_sequence": ["a"]})
+
+    async def call_execute():
+        return workflow.execute("task", {})
+
+    with pytest.raises(RuntimeError, match="aexecute"):
+        asyncio.run(call_execute())
+    assert agents["a"].tasks == []
+
+
+def fake_litellm_response(content):
+    """LiteLLM-shaped completion response."""
+    message = SimpleNamespace(content=content, tool_calls=None)
+    usage = SimpleNamespace(prompt_tokens=1, completion_tokens=2, total_tokens=3)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+def test_execute_twice_with_real_client(monkeypatch):
+    loops = []
+
+    async def acompletion(**kwargs):
+        loops.append(asyncio.get_running_loop())
+        return fake_litellm_response("done")
+
+    fake_litellm = SimpleNamespace(client_session=None, aclient_session=None, acompletion=acompletion)
+    monkeypatch.setattr(llm_client, "_litellm", lambda: fake_litellm)
+
+    client = LLMClient(provider="openai")
+    agent = Agent(AgentConfig(name="a", model="gpt-4o", system_prompt="", tools=[]), client, tool_registry={})
+    workflow = SequentialWorkflow({"a": agent}, {"agent_sequence": ["a"]})
+
+    # Each execute() runs on its own event loop
+    assert workflow.execute("task", {})["result"] == "done"
+    assert workflow.execute("task", {})["result"] == "done"
+    assert loops[0] is not loops[1]
+    # No process-wide HTTP client is tied to the first loop
+    assert fake_litellm.aclient_session is None
+    assert fake_litellm.client_session is None
+
+
+class FakeBatchClient:
+    """LLMClient stand-in that completes batches immediately."""
+
+    provider = "openai"
+
+    def __init__(self):
+        self.payloads = []
+
+    def render_payload(self, custom_id, **kwargs):
+        return {"custom_id": custom_id, "body": kwargs}
+
+    def submit_batch(self, jsonl_path):
+        with open(jsonl_path) as f:
+            self.payloads = f.read().splitlines()
+        return "batch-1"
+
+    def poll_batch(self, batch_id):
+        return "completed"
+
+    def fetch_results(self, batch_id):
+        return {f"job-{i}": {"content": f"batched {i}"} for i in range(len(self.payloads))}
+
+
+def test_sequential_batch_group():
+    client = FakeBatchClient()
+    agents = {name: FakeAgent(name, client) for name in ["a", "b"]}
+    workflow = SequentialWorkflow(agents, {
+        "agent_sequence": ["a", "b"],
+        "parallel_groups": [["a", "b"]],
+        "batch": {"enabled": True, "use_batch_api": True}
+    })
+
+    result = workflow.execute("task", {})
+
+    assert len(client.payloads) == 2
+    assert result["result"] == "a: batched 0\n\nb: batched 1"
+    assert [step["step"] for step in result["execution_log"]] == [
+        "agent_1_start", "agent_2_start", "agent_1_complete", "agent_2_complete"
+    ]
+
+
+def test_sequential_max_history_chars():
+    agents = {name: FakeAgent(name) for name in ["a", "b", "c"]}
+    workflow = SequentialWorkflow(agents, {
+        "agent_sequence": ["a", "b", "c"],
+        "max_history_chars": 30
+    })
+
+    result = workflow.execute("task", {})
+
+    # Each entry is 13 chars of JSON, so only the last two fit
+    assert result["agent_history"] == [
+        {"role": "summary", "content": "1 earlier history entries (13 chars) omitted"},
+        {"agent": "b"},
+        {"agent": "c"}
+    ]
+
+
+def test_hierarchical_parallel_specialists():
+    agents = {name: FakeAgent(name) for name in ["boss", "x", "y"]}
+    workflow = HierarchicalWorkflow(agents, {
+        "agent_sequence": ["boss", "x", "y"],
+        "parallel_specialists": True
+    })
+
+    result = workflow.execute("task", {})
+
+    # Specialists run independently, the synthesis sees both results
+    assert "Previous specialist results" not in agents["y"].tasks[0]
+    assert "x:\nx done" in agents["boss"].tasks[1]
+    assert "y:\ny done" in agents["boss"].tasks[1]
+    assert result["result"] == "boss done"
+    assert result["usage"]["total_tokens"] == 12
+
+
+def test_hierarchical_parallel_failure_cancels_siblings():
+    agents = {name: FakeAgent(name) for name in ["boss", "x", "y"]}
+    cancelled = []
+
+    async def fail(message, **kwargs):
+        raise RuntimeError("x failed")
+
+    async def hang(message, **kwargs):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append("y")
+            raise
+
+    agents["x"].arun = fail
+    agents["y"].arun = hang
+    workflow = HierarchicalWorkflow(agents, {
+        "agent_sequence": ["boss", "x", "y"],
+        "parallel_specialists": True
+    })
+
+    with pytest.raises(RuntimeError, match="x failed"):
+        workflow.execute("task", {})
+    assert cancelled == ["y"]
+
+
+def test_hierarchical_prompt_prefix_cache():
+    agents = {name: FakeAgent(name) for name in ["boss", "x", "y"]}
+    workflow = HierarchicalWorkflow(agents, {
+        "agent_sequence": ["boss", "x", "y"],
+        "prompt_prefix_cache": True
+    })
+
+    workflow.execute("task", {})
+
+    # The shared prefix moves out of the task into the cached prefix
+    prefix = "Original task: task\n\nSupervisor's plan:\nboss done"
+    assert agents["x"].cache_prefixes == [prefix]
+    assert agents["y"].cache_prefixes == [prefix]
+    assert agents["x"].tasks[0].startswith("Your role:")
+    assert "x: x done" in agents["y"].tasks[0]
+
+
+def test_hierarchical_stream_plan():
+    agents = {name: FakeAgent(name) for name in ["boss", "x", "y"]}
+    agents["boss"].reply = "PLAN:\n- Agent: x\n  Subtask: find errors\n- Agent: z\n  Subtask: unknown agent"
+    workflow = HierarchicalWorkflow(agents, {
+        "agent_sequence": ["boss", "x", "y"],
+        "stream_plan": True
+    })
+
+    result = workflow.execute("task", {})
+
+    # x starts from its plan entry, y is not in the plan and gets all of it
+    assert "Your subtask from the supervisor:\nfind errors\n" in agents["x"].tasks[0]
+    assert "Supervisor's plan:\nPLAN:" in agents["y"].tasks[0]
+    assert result["usage"]["total_tokens"] == 12
+
+
+def test_hierarchical_stream_plan_ignores_tool_turn_text():
+    agents = {name: FakeAgent(name) for name in ["boss", "x", "y"]}
+    # Text of a turn that ends in a tool call, then the plan itself
+    agents["boss"].tool_turn_text = "Let me check the logs first.\nAgent: x\nSubtask: draft"
+    agents["boss"].reply = "PLAN:\n- Agent: x\n  Subtask: find errors\n- Agent: y\n  Subtask: explain them"
+    workflow = HierarchicalWorkflow(agents, {
+        "agent_sequence": ["boss", "x", "y"],
+        "stream_plan": True
+    })
+
+    workflow.execute("task", {})
+
+    assert "Your subtask from the supervisor:\nfind errors\n" in agents["x"].tasks[0]
+    assert "draft" not in agents["x"].tasks[0]
+    assert "Your subtask from the supervisor:\nexplain them\n" in agents["y"].tasks[0]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,32 @@
+"""Tests for response_cache.py"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.response_cache import ResponseCache
+
+
+def test_response_cache_persists_and_evicts(tmp_path):
+    db_path = str(tmp_path / "responses.sqlite")
+    response = {"content": "hi", "tool_calls": [], "usage": {"input_tokens": 1, "output_tokens": 1, "total_tokens": 2}}
+
+    cache = ResponseCache(db_path, max_entries=2)
+    cache.put("a", "model", response)
+    cache.put("b", "model", response)
+    assert cache.get("a") == response  # a is now more recent than b
+    cache.put("c", "model", response)
+    cache.close()
+
+    reopened = ResponseCache(db_path, max_entries=2)
+    assert len(reopened) == 2
+    assert reopened.get("a") == response
+    assert reopened.get("b") is None
+    assert reopened.get("c") == response
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
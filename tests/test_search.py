@@ -7,6 +7,8 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from data.log_search import initialize_search, search_logs, get_search_stats
+from data.log_indexer import LogIndexer
+
 
 def test_initialize_and_search():
     # Initialize
@@ -28,6 +30,69 @@ def test_initialize_and_search():
     print("\nFiltered results:")
     print(results)
 
+
+def test_initialize_search_cache(tmp_path):
+    log_file = tmp_path / "sample.log"
+    log_file.write_text("first line\nsecond line with error\n")
+    cache_dir = tmp_path / "cache"
+
+    assert initialize_search([str(log_file)], cache_dir=str(cache_dir)) == 2
+    assert get_search_stats()["cached"] is False
+
+    assert initialize_search([str(log_file)], cache_dir=str(cache_dir)) == 2
+    assert get_search_stats()["cached"] is True
+    assert len(search_logs("error")) == 1
+
+
+def test_query_cache_cleared_on_index(tmp_path):
+    log_file = tmp_path / "sample.log"
+    log_file.write_text("first line\nsecond line with error\n")
+
+    indexer = LogIndexer()
+    indexer.index_file(str(log_file))
+    assert len(indexer.search("error")) == 1
+
+    indexer.index_file(str(log_file), source_name="copy.log")
+    assert len(indexer.search("error")) == 2
+
+
+def test_query_cache_returns_copies(tmp_path):
+    log_file = tmp_path / "sample.json"
+    log_file.write_text('{"message": "error here", "pid": 1}\n')
+
+    indexer = LogIndexer()
+    indexer.index_file(str(log_file))
+    indexer.search("error")[0]["metadata"]["pid"] = 2
+
+    assert indexer.search("error")[0]["metadata"] == {"pid": 1}
+
+
+def test_bulk_index_and_rebuild(tmp_path):
+    log_file = tmp_path / "sample.log"
+    log_file.write_text("first line\nsecond line with error\n")
+
+    indexer = LogIndexer()
+    indexer.index_file(str(log_file), bulk=True)
+    indexer.index_file(str(log_file), source_name="copy.log", bulk=True)
+    assert indexer.search("error") == []
+
+    indexer.rebuild_fts()
+    assert len(indexer.search("error")) == 2
+
+
+def test_save_and_load(tmp_path):
+    log_file = tmp_path / "sample.log"
+    log_file.write_text("first line\nsecond line with error\n")
+
+    indexer = LogIndexer()
+    indexer.index_file(str(log_file))
+    indexer.save(str(tmp_path / "index.sqlite"))
+
+    loaded = LogIndexer.load(str(tmp_path / "index.sqlite"), in_memory=True)
+    assert loaded.count_logs() == 2
+    assert loaded.search("error")[0]["line_number"] == 2
+
+
 if __name__ == "__main__":
     # pytest.main([__file__, "-v"])
     test_initialize_and_search()
\ No newline at end of file
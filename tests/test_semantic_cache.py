@@ -0,0 +1,140 @@
+"""Tests for semantic_cache.py"""
+
+import asyncio
+import pytest
+from pathlib import Path
+import sys
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core import semantic_cache
+from core.semantic_cache import SemanticCache
+
+# Stub embeddings: the two "status" questions are close, "weather" is not
+VECTORS = {
+    "What is the status?": [1.0, 0.0, 0.0],
+    "What's the status?": [0.95, 0.05, 0.0],
+    "What is the weather?": [0.0, 1.0, 0.0],
+}
+
+
+class FakeClient:
+    """LLMClient stand-in that answers with a numbered response."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def _response(self):
+        self.calls += 1
+        return {"content": f"answer {self.calls}", "tool_calls": [], "usage": {"total_tokens": 3}}
+
+    def complete(self, **kwargs):
+        return self._response()
+
+    async def acomplete(self, **kwargs):
+        return self._response()
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    """Replace LiteLLM's embedding calls with lookups in VECTORS."""
+    fake = SimpleNamespace(failing=False)
+
+    def embedding(model, input):
+        if fake.failing:
+            raise ConnectionError("embedding server down")
+        return SimpleNamespace(data=[{"embedding": VECTORS[input[0]]}])
+
+    async def aembedding(model, input):
+        return embedding(model, input)
+
+    fake.embedding = embedding
+    fake.aembedding = aembedding
+    monkeypatch.setattr(semantic_cache, "_litellm", lambda: fake)
+    return fake
+
+
+def ask(cache, question, model="gpt-4o", system=None):
+    return cache.complete(model=model, messages=[{"role": "user", "content": question}], system=system)
+
+
+def test_similar_prompt_hits_above_threshold(embeddings):
+    client = FakeClient()
+    cache = SemanticCache(client, "embed", threshold=0.9)
+
+    first = ask(cache, "What is the status?")
+    second = ask(cache, "What's the status?")
+    third = ask(cache, "What is the weather?")
+
+    assert second == first
+    assert third["content"] == "answer 2"
+    assert client.calls == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_threshold_rejects_less_similar_prompt(embeddings):
+    client = FakeClient()
+    cache = SemanticCache(client, "embed", threshold=0.9999)
+
+    ask(cache, "What is the status?")
+    ask(cache, "What's the status?")
+
+    assert client.calls == 2
+    assert cache.hits == 0
+
+
+def test_namespaces_are_separate(embeddings):
+    client = FakeClient()
+    cache = SemanticCache(client, "embed")
+
+    ask(cache, "What is the status?", system="You are a log analyst.")
+    ask(cache, "What is the status?", system="You are a poet.")
+    ask(cache, "What is the status?", model="gpt-4o-mini", system="You are a log analyst.")
+
+    assert client.calls == 3
+    assert cache.hits == 0
+
+
+def test_entries_persist_in_sqlite(embeddings, tmp_path):
+    db_path = str(tmp_path / "semantic.db")
+    client = FakeClient()
+    ask(SemanticCache(client, "embed", db_path=db_path), "What is the status?")
+
+    reopened = SemanticCache(client, "embed", db_path=db_path)
+    response = ask(reopened, "What's the status?")
+
+    assert response["content"] == "answer 1"
+    assert client.calls == 1
+    assert reopened.hits == 1
+
+
+def test_embedding_failure_completes_uncached(embeddings):
+    client = FakeClient()
+    cache = SemanticCache(client, "embed")
+    embeddings.failing = True
+
+    assert ask(cache, "What is the status?")["content"] == "answer 1"
+    response = asyncio.run(cache.acomplete(model="gpt-4o", messages=[{"role": "user", "content": "What is the status?"}]))
+
+    assert response["content"] == "answer 2"
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_cached_response_is_a_copy(embeddings):
+    client = FakeClient()
+    cache = SemanticCache(client, "embed")
+
+    # Modifying the response returned on a miss or a hit leaves the cache intact
+    first = ask(cache, "What is the status?")
+    first["tool_calls"].append({"name": "changed"})
+    second = ask(cache, "What is the status?")
+    second["usage"]["total_tokens"] = 0
+
+    assert ask(cache, "What is the status?") == {"content": "answer 1", "tool_calls": [], "usage": {"total_tokens": 3}}
+    assert client.calls == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -69,6 +69,17 @@ def test_get_tools_for_agent():
     assert "list_files" not in tools
 
 
+def test_get_tools_for_agent_cached():
+    """Test that agents with the same tools share one read-only registry in config order."""
+    first = get_tools_for_agent(["search_logs", "read_file"])
+    second = get_tools_for_agent(["search_logs", "read_file"])
+
+    assert first is second
+    assert list(first) == ["search_logs", "read_file"]
+    with pytest.raises(TypeError):
+        first["list_files"] = {}
+
+
 def test_get_tools_for_agent_invalid():
     """Test getting invalid tool."""
     with pytest.raises(ValueError):